@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+# Agregações usadas pelo painel, sem depender do Streamlit (o painel só põe cache em volta).
+# As linhas TOTAL do master também saem daqui (dados.py), para o xlsx e o painel somarem do mesmo jeito.
+import codecs
+import io
+import numpy as np
+import pandas as pd
+
+COLUNAS_QTD_NIVEL = ["Qtd Inicial", "Qtd Final"]
+COLUNAS_PONTUACAO = ["Pontuação Inicial", "Pontuação Final"]
+ROTULO_TOTAL = "TOTAL"
+
+# ====== LINHAS TOTAL: SÓ NO XLSX; O PAINEL SOMA O DETALHE ======
+def linhas_de_total(chave: pd.Series) -> np.ndarray:
+    # linhas de total de uma aba do master: chave (Grupo/COOPERATIVA) vazia ou 'TOTAL'
+    rotulo = chave.astype("string").str.strip().str.upper()
+    return (rotulo.isna() | (rotulo == ROTULO_TOTAL)).to_numpy(dtype=bool, na_value=True)
+
+def so_detalhe(df: pd.DataFrame, chave: str) -> pd.DataFrame:
+    # a aba sem as linhas de total (uma vez por versão dos dados, ao preparar o cache colunar)
+    total = linhas_de_total(df[chave])
+    if not total.any():
+        return df
+    df = df[~total].reset_index(drop=True)
+    if isinstance(df[chave].dtype, pd.CategoricalDtype):
+        df[chave] = df[chave].cat.remove_unused_categories()
+    return df
+
+def total_niveis(niveis_df: pd.DataFrame) -> pd.DataFrame:
+    # linhas TOTAL do niveis_master: Qtd Inicial/Final somadas por Nível
+    return (niveis_df.groupby("Nível", as_index=False, observed=True)[COLUNAS_QTD_NIVEL]
+            .sum().assign(Grupo=ROTULO_TOTAL))
+
+def total_financeiro(financeiro_df: pd.DataFrame) -> pd.DataFrame:
+    # linha TOTAL do financeiro_master: somas do bloco e a evolução sobre elas
+    soma_i = financeiro_df["Soma Inicial (todos)"].sum()
+    soma_f = financeiro_df["Soma Final (todos)"].sum()
+    return pd.DataFrame([{
+        "Grupo": ROTULO_TOTAL,
+        "Bloco": "Gestão Financeira",
+        "Soma Inicial (todos)": soma_i,
+        "Soma Final (todos)": soma_f,
+        "Evolução Absoluta": soma_f - soma_i,
+        "% sobre Inicial": (soma_f - soma_i) / soma_i * 100.0 if soma_i else np.nan,
+    }])
+
+# ====== ÍNDICE POR COOPERATIVA (FILTRO DA SIDEBAR) ======
+def posicoes_por_grupo(df: pd.DataFrame, coluna: str) -> dict[str, np.ndarray]:
+    # posições (iloc) das linhas de cada grupo, numa passada só pela tabela
+    if df.empty:
+        return {}
+    return dict(df.groupby(coluna, observed=True, sort=False).indices)
+
+def construir_indice(comparativo_df, niveis_df, financeiro_df, status_df, canceladas_df) -> dict:
+    # montado uma vez por versão dos dados (tabelas só com o detalhe, sem linhas TOTAL); qualquer seleção
+    # da sidebar sai daqui sem varrer as tabelas
+    somas_niveis = {}
+    if not niveis_df.empty:
+        somas = niveis_df.groupby(["Grupo", "Nível"], observed=True, sort=False)[COLUNAS_QTD_NIVEL].sum()
+        somas_niveis = {g: d.droplevel("Grupo") for g, d in somas.groupby(level="Grupo", observed=True, sort=False)}
+    return {
+        "grupos": sorted(comparativo_df["Grupo"].dropna().unique().tolist()),
+        "comparativo": posicoes_por_grupo(comparativo_df, "Grupo"),
+        "financeiro": posicoes_por_grupo(financeiro_df, "Grupo"),
+        "canceladas": posicoes_por_grupo(canceladas_df, "COOPERATIVA"),
+        "niveis": somas_niveis,
+        "comparativo_parciais": parciais_comparativo(comparativo_df),
+        "clientes": status_df.groupby("COOPERATIVA", observed=True)["Quantidade de clientes"].sum(),
+        "cancelados": canceladas_df.groupby("COOPERATIVA", observed=True)["TOTAL"].sum(),
+    }
+
+def fatiar(df: pd.DataFrame, posicoes: dict[str, np.ndarray], grupos) -> pd.DataFrame:
+    # linhas dos grupos pedidos, na mesma ordem em que aparecem na tabela original
+    pedacos = [posicoes[g] for g in grupos if g in posicoes]
+    if not pedacos:
+        return df.iloc[0:0]
+    return df.iloc[np.sort(np.concatenate(pedacos))]
+
+def somar_niveis(somas_niveis: dict[str, pd.DataFrame], grupos=None, rotulo: str = "Seleção") -> pd.DataFrame:
+    # soma das Qtd Inicial/Final por Nível só com os subtotais pré-calculados de cada grupo; grupos=None -> todos
+    grupos = somas_niveis.keys() if grupos is None else grupos
+    pedacos = [somas_niveis[g] for g in grupos if g in somas_niveis]
+    if not pedacos:
+        return pd.DataFrame(columns=["Nível"] + COLUNAS_QTD_NIVEL + ["Grupo"])
+    soma = pd.concat(pedacos).groupby(level="Nível", observed=True).sum().reset_index()
+    soma["Grupo"] = rotulo
+    return soma
+
+# ====== COMPARATIVO: MÉDIAS POR GRUPO A PARTIR DE SOMAS PARCIAIS ======
+def parciais_comparativo(comparativo_df: pd.DataFrame) -> pd.DataFrame:
+    # por Grupo: participantes + soma/contagem (sem NaN) das pontuações e da evolução por participante;
+    # a média de qualquer seleção de grupos sai daqui só com somas
+    df = comparativo_df[["Grupo"] + COLUNAS_PONTUACAO].copy()
+    df["Evolução"] = df["Pontuação Final"] - df["Pontuação Inicial"]
+    g = df.groupby("Grupo", observed=True)
+    cols = COLUNAS_PONTUACAO + ["Evolução"]
+    parciais = pd.concat([g[cols].sum().add_prefix("soma "), g[cols].count().add_prefix("n ")], axis=1)
+    parciais["Participantes"] = g.size()
+    return parciais
+
+def _media(soma, n) -> float:
+    return soma / n if n else np.nan
+
+def _da_selecao(parciais, grupos):
+    # linhas (grupos no índice) da seleção; grupos=None -> todas
+    return parciais if grupos is None else parciais[parciais.index.isin(list(grupos))]
+
+def agregar_comparativo(parciais: pd.DataFrame, grupos=None) -> tuple[pd.DataFrame, dict[str, float]]:
+    # grupos=None -> todos. Devolve (tabela por Grupo, médias gerais por participante)
+    sel = _da_selecao(parciais, grupos)
+    tabela = pd.DataFrame({
+        "Grupo": sel.index,
+        "Pontuação Inicial": (sel["soma Pontuação Inicial"] / sel["n Pontuação Inicial"]).to_numpy(),
+        "Pontuação Final": (sel["soma Pontuação Final"] / sel["n Pontuação Final"]).to_numpy(),
+    })
+    tabela["Evolução"] = tabela["Pontuação Final"] - tabela["Pontuação Inicial"]
+    tabela["Participantes"] = sel["Participantes"].to_numpy()
+    medias = {c: _media(sel[f"soma {c}"].sum(), sel[f"n {c}"].sum()) for c in COLUNAS_PONTUACAO + ["Evolução"]}
+    return tabela, medias
+
+def agregar_adesao(financeiro_sel: pd.DataFrame, participantes: pd.Series) -> pd.DataFrame:
+    # linhas de financeiro + participantes de cada grupo + ganho de adesão
+    adesao = financeiro_sel.copy()
+    adesao["Participantes"] = participantes.reindex(adesao["Grupo"]).fillna(0).astype("int64").to_numpy()
+    if not adesao.empty:
+        adesao["Ganho de Adesão"] = adesao["Soma Final"] - adesao["Soma Inicial"]
+    return adesao
+
+# ====== KPIs DA SELEÇÃO (SÓ SOMAS DAS PARCIAIS POR GRUPO) ======
+def calcular_kpis(indice: dict, grupos=None) -> dict:
+    # cartões do topo e da Visão Geral; grupos=None -> todos. Clientes vêm da aba de status (para bater
+    # com o Excel) e hoje os finalizados são os mesmos clientes; cancelados, da coluna TOTAL das canceladas
+    comparativo = _da_selecao(indice["comparativo_parciais"], grupos)
+    clientes = _da_selecao(indice["clientes"], grupos).sum()
+    finalizados = clientes
+    return {
+        "cooperativas": len(comparativo),
+        "clientes": clientes,
+        "finalizados": finalizados,
+        "cancelados": _da_selecao(indice["cancelados"], grupos).sum(),
+        "conclusao": (100 * finalizados / clientes) if clientes > 0 else 0,
+        "media_inicial": _media(comparativo["soma Pontuação Inicial"].sum(), comparativo["n Pontuação Inicial"].sum()),
+        "media_final": _media(comparativo["soma Pontuação Final"].sum(), comparativo["n Pontuação Final"].sum()),
+    }
+
+# ====== PERFIL: CUBO RESPOSTA × NÍVEL FINAL × GRUPO ======
+PERGUNTAS_PERFIL = ['TEM SUCESSÃO FAMILIAR? (JOVENS INSERIDOS NO NEGÓCIO)', 'TEM MULHER NA GESTÃO DA PROPRIEDADE?',
+                    'A PROPRIEDADE TRABALHA COM', 'Potencial para um nível 2 de trabalho?']
+# perguntas analisadas junto com o Nível Final (pizza + barras por nível); as demais, só a distribuição
+PERGUNTAS_POR_NIVEL = ['Potencial para um nível 2 de trabalho?', 'TEM MULHER NA GESTÃO DA PROPRIEDADE?',
+                       'TEM SUCESSÃO FAMILIAR? (JOVENS INSERIDOS NO NEGÓCIO)']
+
+def construir_cubo_perfil(comparativo_df: pd.DataFrame, perguntas) -> dict[str, pd.DataFrame]:
+    # por pergunta: participantes por Grupo (linhas) × (resposta, Nível Final) (colunas). Quem não respondeu
+    # fica de fora; Nível Final vazio fica (conta nas respostas, não no gráfico por nível).
+    # Uma vez por versão dos dados: qualquer seleção de grupos vira a soma de algumas linhas
+    cubos = {}
+    for pergunta in perguntas:
+        df = comparativo_df.loc[comparativo_df[pergunta].notna(), ["Grupo", pergunta, "Nível Final"]]
+        contagem = df.groupby(["Grupo", pergunta, "Nível Final"], observed=True, dropna=False).size()
+        cubos[pergunta] = contagem.unstack([pergunta, "Nível Final"], fill_value=0)
+    return cubos
+
+def somar_cubo(cubo: pd.DataFrame, grupos=None) -> pd.Series:
+    # contagem por (resposta, Nível Final) da seleção; grupos=None -> todos
+    return _da_selecao(cubo, grupos).sum()
+
+def contagem_respostas(soma: pd.Series, com_nivel: bool = False) -> pd.Series:
+    # o value_counts() das respostas da seleção (maior primeiro; empate na ordem das respostas), sem os zeros.
+    # com_nivel: só quem tem Nível Final (o dropna(subset=[pergunta, 'Nível Final']) das perguntas especiais)
+    if com_nivel:
+        soma = soma[soma.index.get_level_values(1).notna()]
+    contagem = soma.groupby(level=0, observed=True).sum().sort_values(ascending=False, kind="stable")
+    return contagem[contagem > 0]
+
+def niveis_por_resposta(soma: pd.Series, pergunta: str, niveis: list[str]) -> pd.DataFrame:
+    # contagem por resposta e Nível Final (só os níveis conhecidos e as combinações presentes), ordenada por nível
+    tabela = soma[soma.index.get_level_values(1).isin(niveis)].rename("Contagem").reset_index()
+    tabela.columns = [pergunta, "Nível Final", "Contagem"]
+    tabela = tabela[tabela["Contagem"] > 0].reset_index(drop=True)
+    tabela["Nível Final"] = pd.Categorical(tabela["Nível Final"], categories=niveis, ordered=True)
+    return tabela.sort_values(by="Nível Final", kind="stable")
+
+def resumo_respostas(contagem: pd.Series) -> pd.DataFrame:
+    # Resposta, Contagem e Porcentagem, da menor para a maior contagem (ordem das barras do gráfico)
+    resumo = pd.DataFrame({"Resposta": contagem.index, "Contagem": contagem.values,
+                           "Porcentagem": (contagem / contagem.sum() * 100).values})
+    return resumo.sort_values(by="Contagem", ascending=True)
+
+# ====== TABELAS DE DETALHE (PAGINAÇÃO NO SERVIDOR) ======
+def texto_busca(df: pd.DataFrame) -> pd.Series:
+    # uma string minúscula por linha juntando as colunas de texto; montada uma vez por tabela e reaproveitada em toda busca
+    colunas = [c for c in df.columns if not pd.api.types.is_numeric_dtype(df[c]) and not pd.api.types.is_bool_dtype(df[c])]
+    texto = pd.Series("", index=range(len(df)), dtype="string")
+    for c in colunas:
+        texto = texto + "\x1f" + df[c].reset_index(drop=True).astype("string").fillna("").str.lower()
+    return texto
+
+def ordem_linhas(df: pd.DataFrame, coluna: str | None, decrescente: bool = False) -> np.ndarray:
+    # posições (iloc) das linhas ordenadas pela coluna; vazios no fim e empates na ordem original
+    if coluna is None or coluna not in df.columns:
+        return np.arange(len(df))
+    serie = df[coluna].reset_index(drop=True)
+    return serie.sort_values(ascending=not decrescente, kind="stable", na_position="last").index.to_numpy()
+
+def selecionar_linhas(ordem: np.ndarray, texto: pd.Series, busca: str) -> np.ndarray:
+    # posições ordenadas que casam com a busca (trecho literal, sem diferenciar maiúsculas)
+    busca = busca.strip().lower()
+    if not busca:
+        return ordem
+    casa = texto.str.contains(busca, regex=False).to_numpy(dtype=bool, na_value=False)
+    return ordem[casa[ordem]]
+
+def fatia_pagina(posicoes: np.ndarray, pagina: int, tamanho: int) -> np.ndarray:
+    inicio = (pagina - 1) * tamanho
+    return posicoes[inicio:inicio + tamanho]
+
+def exportar_csv(df: pd.DataFrame, posicoes: np.ndarray, colunas: list[str], bloco: int = 50_000) -> io.BytesIO:
+    # CSV em blocos (nunca copia a seleção inteira de uma vez); BOM para o Excel abrir os acentos certos
+    saida = io.BytesIO()
+    saida.write(codecs.BOM_UTF8)
+    for inicio in range(0, max(len(posicoes), 1), bloco):
+        df.iloc[posicoes[inicio:inicio + bloco]][colunas].to_csv(saida, index=False, header=inicio == 0, encoding="utf-8")
+    saida.seek(0)
+    return saida
+
+def exportar_parquet(df: pd.DataFrame, posicoes: np.ndarray, colunas: list[str]) -> io.BytesIO:
+    saida = io.BytesIO()
+    df.iloc[posicoes][colunas].reset_index(drop=True).to_parquet(saida, index=False)
+    saida.seek(0)
+    return saida
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+# Aquecimento do painel: rodar no deploy, antes do `streamlit run painel.py`, para o 1º acesso não pagar
+#  • o cache colunar do master (sem ele o 1º load do painel lê o xlsx e ainda regrava o cache);
+#  • os imports (plotly + módulos do painel importados uma vez => .pyc já gravados);
+#  • --render: roda o painel inteiro uma vez, headless, e mostra quanto a 1ª tela levou.
+from pathlib import Path
+import argparse
+import importlib
+import os
+import time
+
+import dados
+
+EXCEL_PATH = Path("master_resultados.xlsx")  # o mesmo do painel (relativo à pasta do app)
+MODULOS = ["agregacoes", "graficos", "plotly.express", "plotly.graph_objects", "pyarrow.feather", "openpyxl"]
+
+def aquecer_dados(xlsx_path: Path) -> bool:
+    # True se o cache colunar já estava em dia
+    t0 = time.perf_counter()
+    if dados.ler_sidecar(xlsx_path, abas=[]) is not None:  # abas=[]: só confere se a versão já existe
+        print(f"🗂️ Cache colunar em dia ({time.perf_counter() - t0:.2f}s para conferir)")
+        return True
+    dados.gerar_sidecar(xlsx_path)
+    print(f"🗂️ Cache colunar (re)gerado em {time.perf_counter() - t0:.2f}s")
+    return False
+
+def aquecer_imports(modulos: list[str] = MODULOS):
+    for nome in modulos:
+        t0 = time.perf_counter()
+        try:
+            importlib.import_module(nome)
+        except ImportError as e:
+            print(f"⚠️ {nome}: {e}")
+            continue
+        print(f"📦 {nome}: {(time.perf_counter() - t0) * 1000:.0f} ms")
+
+def renderizar(app_dir: Path, timeout: float = 300) -> float:
+    # executa o painel como o Streamlit faria numa sessão nova (sem navegador) e devolve os segundos
+    from streamlit.testing.v1 import AppTest
+    anterior = Path.cwd()
+    os.chdir(app_dir)
+    try:
+        t0 = time.perf_counter()
+        at = AppTest.from_file(str(app_dir / "painel.py"), default_timeout=timeout).run()
+        segundos = time.perf_counter() - t0
+    finally:
+        os.chdir(anterior)
+    if at.exception:
+        raise RuntimeError(f"painel com erro: {at.exception[0].value}")
+    return segundos
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Deixa o painel pronto antes do primeiro acesso")
+    parser.add_argument("--app", type=Path, default=Path(__file__).resolve().parent, help="pasta do painel.py")
+    parser.add_argument("--render", action="store_true", help="roda o painel uma vez (headless) e mede a 1ª tela")
+    args = parser.parse_args()
+
+    app_dir = args.app.resolve()
+    aquecer_dados(app_dir / EXCEL_PATH)
+    aquecer_imports()
+    if args.render:
+        print(f"🖥️ 1ª tela do painel: {renderizar(app_dir):.2f}s")
+    print("✅ Painel aquecido")
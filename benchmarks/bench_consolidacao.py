@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+# Mede o dados.main() sequencial vs. --workers N num corpus sintético e confere
+# que todas as execuções geram o mesmo master (mesmas abas, mesmas células).
+from pathlib import Path
+import argparse
+import contextlib
+import io
+import shutil
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import dados  # noqa: E402
+from gerar_corpus import gerar_corpus  # noqa: E402
+
+def rodar(raiz: Path, workers: int) -> tuple[float, dict[str, pd.DataFrame]]:
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        dados.main(raiz=raiz, workers=workers)
+    dt = time.perf_counter() - t0
+    return dt, pd.read_excel(raiz / dados.OUT_PATH.name, sheet_name=None)
+
+def mesmo_master(a: dict[str, pd.DataFrame], b: dict[str, pd.DataFrame]) -> bool:
+    if list(a) != list(b):
+        return False
+    try:
+        for aba in a: pd.testing.assert_frame_equal(a[aba], b[aba])
+    except AssertionError:
+        return False
+    return True
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark da consolidação (sequencial vs. processos)")
+    parser.add_argument("--cooperativas", type=int, default=500)
+    parser.add_argument("--clientes", type=int, default=20)
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4, 8, 16])
+    parser.add_argument("--corpus", type=Path, default=None, help="reaproveita/gera o corpus nesta pasta")
+    args = parser.parse_args()
+
+    raiz = args.corpus or Path(tempfile.mkdtemp(prefix="bench_dados_"))
+    if not any(raiz.rglob("*resultado*.xlsx")):
+        t0 = time.perf_counter()
+        gerar_corpus(raiz, args.cooperativas, args.clientes)
+        print(f"🧪 corpus: {args.cooperativas} planilhas em {raiz} ({time.perf_counter() - t0:.1f}s)")
+
+    base_t, base = rodar(raiz, 1)
+    print(f"workers= 1  {base_t:7.2f}s  1.00x")
+    for w in args.workers:
+        t, master = rodar(raiz, w)
+        ok = "ok" if mesmo_master(base, master) else "DIFERENTE!"
+        print(f"workers={w:2d}  {t:7.2f}s  {base_t / t:.2f}x  master {ok}")
+
+    if args.corpus is None:
+        shutil.rmtree(raiz, ignore_errors=True)
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+# Memória de N réplicas do painel no mesmo host, cada uma num processo com as tabelas do load_all_data:
+#  • mapeado: dados.ler_sidecar (o cache colunar da versão, via mmap: as páginas são do SO, divididas);
+#  • copia:   as mesmas tabelas lidas para a memória do processo (pd.read_feather), uma cópia por réplica.
+# Mede por réplica o tempo de carga, o PSS (RSS com as páginas divididas rateadas entre os processos) e a
+# memória privada (só dela), descontado um processo que só importou o dados.py. Só Linux (/proc/<pid>/smaps_rollup).
+from pathlib import Path
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+import dados  # noqa: E402
+from gerar_master import gerar_master  # noqa: E402
+
+MODOS = ["mapeado", "copia"]
+CODIGO = """
+import sys, time, json
+sys.path.insert(0, {raiz!r})
+import pandas as pd, dados
+from pathlib import Path
+xlsx, versao, modo = Path({xlsx!r}), {versao!r}, {modo!r}
+t0 = time.perf_counter()
+if modo == "mapeado":
+    tabelas = dados.ler_sidecar(xlsx, versao, dados.ABAS_PAINEL)
+elif modo == "copia":
+    pasta = dados.pasta_versao(xlsx, versao)
+    tabelas = {{aba: pd.read_feather(pasta / f"{{aba}}.feather") for aba in dados.ABAS_PAINEL}}
+print(json.dumps({{"carga_s": round(time.perf_counter() - t0, 3)}}), flush=True)
+sys.stdin.read()  # segura as tabelas até o processo pai medir
+"""
+
+def memoria_kb(pid: int) -> dict[str, int]:
+    campos = {}
+    for linha in Path(f"/proc/{pid}/smaps_rollup").read_text().splitlines()[1:]:
+        nome, valor = linha.split(":", 1)
+        campos[nome] = int(valor.split()[0])
+    return {"pss": campos["Pss"], "privada": campos["Private_Clean"] + campos["Private_Dirty"]}
+
+def rodar(xlsx: Path, versao: str, modo: str, replicas: int) -> list[dict]:
+    # sobe as réplicas juntas, espera todas carregarem e mede com todas vivas
+    codigo = CODIGO.format(raiz=str(RAIZ), xlsx=str(xlsx), versao=versao, modo=modo)
+    processos = [subprocess.Popen([sys.executable, "-c", codigo], stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+                 for _ in range(replicas)]
+    try:
+        medidas = [json.loads(p.stdout.readline()) | memoria_kb(p.pid) for p in processos]
+    finally:
+        for p in processos:
+            p.communicate("")
+    return medidas
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Memória por réplica do painel: cache colunar mapeado x cópia por processo")
+    parser.add_argument("--escala", default="1000x200000", metavar="COOPSxPARTICIPANTES")
+    parser.add_argument("--replicas", type=int, default=4)
+    parser.add_argument("--xlsx", type=Path, default=None, help="master existente (padrão: gera um sintético)")
+    args = parser.parse_args()
+    if not Path("/proc/self/smaps_rollup").exists():
+        raise SystemExit("⚠️ Precisa do /proc/<pid>/smaps_rollup (Linux)")
+
+    with tempfile.TemporaryDirectory(prefix="bench_replicas_") as tmp:
+        xlsx = args.xlsx
+        if xlsx is None:
+            n_coops, participantes = (int(x) for x in args.escala.lower().split("x"))
+            xlsx = gerar_master(Path(tmp), n_coops, participantes)
+        versao = dados.hash_arquivo(xlsx)
+        if dados.ler_sidecar(xlsx, versao, abas=[]) is None:
+            dados.gerar_sidecar(xlsx, versao=versao)
+        # a mesma quantidade de processos só com os imports: as bibliotecas também são páginas divididas
+        base = rodar(xlsx, versao, "", args.replicas)
+        base_pss, base_privada = sum(m["pss"] for m in base), max(m["privada"] for m in base)
+        print(f"🧪 {xlsx.name}: {args.replicas} réplicas (descontados {base_pss / 1024:.0f} MB dos imports)")
+        for modo in MODOS:
+            medidas = rodar(xlsx, versao, modo, args.replicas)
+            pss = (sum(m["pss"] for m in medidas) - base_pss) / 1024
+            privada = (max(m["privada"] for m in medidas) - base_privada) / 1024
+            carga = max(m["carga_s"] for m in medidas)
+            print(f"   {modo:<8} carga {carga:6.2f}s | PSS somado {pss:8.1f} MB | privada por réplica {privada:8.1f} MB")
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+# Mede o start do painel em processos novos, como num container recém-criado:
+#  • imports (python -X importtime) dos módulos que o painel carrega antes da 1ª tela;
+#  • tempo até a 1ª tela (AppTest, headless) sem cache colunar ("frio") e com ele ("morno").
+# Com --max-import-ms / --max-render-s sai com código 1 quando passar do limite (serve de alarme no CI).
+from pathlib import Path
+import argparse
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = Path(__file__).resolve().parent.parent
+ARQUIVOS_APP = ["painel.py", "dados.py", "agregacoes.py", "graficos.py", "instrumentacao.py", "recarga.py", "sebrae.png"]
+IMPORTS_PAINEL = "import pandas, numpy, pytz, streamlit, dados, agregacoes, graficos, instrumentacao, recarga"
+DESTAQUES = ["pandas", "numpy", "streamlit", "pytz", "dados", "agregacoes", "graficos", "plotly", "pyarrow", "openpyxl"]
+
+def medir_imports(app_dir: Path) -> dict[str, float]:
+    # ms acumulados por pacote de topo ("plotly" só aparece se alguém o importar no start) + "total".
+    # Cada linha de topo só conta o que ela importou pela 1ª vez, então a soma delas é o custo total
+    r = subprocess.run([sys.executable, "-X", "importtime", "-c", IMPORTS_PAINEL],
+                       cwd=app_dir, capture_output=True, text=True, check=True)
+    tempos = {"total": 0.0}
+    for linha in r.stderr.splitlines():
+        if not linha.startswith("import time:") or linha.count("|") != 2:
+            continue
+        _, acumulado, nome = linha.split("|")
+        if not acumulado.strip().isdigit() or nome.startswith("  "):  # recuo = import aninhado
+            continue
+        ms = int(acumulado) / 1000
+        tempos["total"] += ms
+        if nome.strip() in DESTAQUES:
+            tempos[nome.strip()] = ms
+    return tempos
+
+def medir_render(app_dir: Path) -> float:
+    # processo novo do início ao fim da 1ª execução completa do painel
+    codigo = ("from streamlit.testing.v1 import AppTest; "
+              "at = AppTest.from_file('painel.py', default_timeout=600).run(); "
+              "assert not at.exception, at.exception[0].value")
+    t0 = time.perf_counter()
+    subprocess.run([sys.executable, "-c", codigo], cwd=app_dir, capture_output=True, check=True)
+    return time.perf_counter() - t0
+
+def copiar_app(destino: Path, xlsx: Path):
+    for nome in ARQUIVOS_APP:
+        if (RAIZ / nome).exists():
+            shutil.copy2(RAIZ / nome, destino / nome)
+    shutil.copy2(xlsx, destino / "master_resultados.xlsx")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark do start do painel (imports + 1ª tela)")
+    parser.add_argument("--xlsx", type=Path, default=RAIZ / "master_resultados.xlsx", help="master usado no teste")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--max-import-ms", type=float, default=None, help="limite para o total dos imports")
+    parser.add_argument("--max-render-s", type=float, default=None, help="limite para a 1ª tela com cache (morno)")
+    parser.add_argument("--saida", type=Path, default=None, help="grava o resultado em JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench_startup_") as tmp:
+        app_dir = Path(tmp)
+        copiar_app(app_dir, args.xlsx)
+        # 1ª rodada de imports grava os .pyc da cópia; as medidas são das seguintes
+        medir_imports(app_dir)
+        imports = [medir_imports(app_dir) for _ in range(args.repeticoes)]
+        frio, morno = [], []
+        for _ in range(args.repeticoes):
+            shutil.rmtree(app_dir / "master_resultados_colunar", ignore_errors=True)
+            frio.append(medir_render(app_dir))
+            morno.append(medir_render(app_dir))
+
+    melhor = {nome: min(r.get(nome, 0.0) for r in imports) for nome in imports[0]}
+    resultado = {
+        "imports_ms": melhor,
+        "imports_total_ms": melhor.pop("total"),
+        "plotly_no_start": "plotly" in melhor,
+        "render_frio_s": min(frio),
+        "render_morno_s": min(morno),
+    }
+    print("📦 Imports (ms acumulados, melhor de", args.repeticoes, "):")
+    for nome, ms in sorted(melhor.items(), key=lambda x: -x[1]):
+        print(f"   {nome:<12} {ms:8.1f}")
+    print(f"   {'total':<12} {resultado['imports_total_ms']:8.1f}")
+    print(f"   plotly importado no start: {'sim ⚠️' if resultado['plotly_no_start'] else 'não'}")
+    print(f"🖥️ 1ª tela sem cache colunar: {resultado['render_frio_s']:.2f}s | com cache: {resultado['render_morno_s']:.2f}s")
+
+    if args.saida:
+        args.saida.write_text(json.dumps(resultado, ensure_ascii=False, indent=1), encoding="utf-8")
+        print(f"💾 {args.saida}")
+
+    estourou = []
+    if args.max_import_ms is not None and resultado["imports_total_ms"] > args.max_import_ms:
+        estourou.append(f"imports {resultado['imports_total_ms']:.0f} ms > {args.max_import_ms:.0f} ms")
+    if args.max_render_s is not None and resultado["render_morno_s"] > args.max_render_s:
+        estourou.append(f"1ª tela {resultado['render_morno_s']:.2f}s > {args.max_render_s:.2f}s")
+    if estourou:
+        print("❌ Regressão:", "; ".join(estourou))
+        raise SystemExit(1)
@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+# Suíte de benchmarks com dados sintéticos, por escala ("<cooperativas>x<participantes>", p.ex. 5000x1000000):
+#  • consolidacao: dados.main() num corpus de planilhas de cooperativa (gerar_corpus.py);
+#  • carga_xlsx / carga_colunar: o que o load_all_data faz sem e com o cache colunar (master de gerar_master.py);
+#  • indice, filtro, agregacao, tabela, perfil: os caminhos do agregacoes.py que rodam a cada clique;
+#  • figuras / figuras_json: montagem das figuras (graficos.py) e a serialização que o st.plotly_chart faz;
+#  • painel_*: o painel inteiro headless (AppTest): 1ª tela fria/morna, cada aba e a troca de filtro,
+#    com o tempo de cada etapa do rerun vindo do instrumentacao.py (PAINEL_TEMPOS_DIR).
+# Resultado em JSON (benchmarks/resultados/ por padrão); --comparar <json> aponta regressões e sai com código 1.
+from pathlib import Path
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# antes de importar o dados/painel: o instrumentacao lê o ambiente uma vez só
+PASTA_TEMPOS = Path(tempfile.mkdtemp(prefix="bench_tempos_"))
+os.environ["PAINEL_TEMPOS_DIR"] = str(PASTA_TEMPOS)
+
+import pandas as pd  # noqa: E402
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+import agregacoes  # noqa: E402
+import dados  # noqa: E402
+import graficos  # noqa: E402
+import recarga  # noqa: E402
+from gerar_corpus import gerar_corpus  # noqa: E402
+from gerar_master import PERGUNTAS, gerar_master  # noqa: E402
+
+ESCALAS = ["10x200", "200x5000", "1000x50000"]
+NOMES_ABAS = ["Visão Geral", "Detalhe Canceladas", "Análise Comparativa por Grupo", "Análise por Perfil", "Dados Detalhados"]
+PASTA_RESULTADOS = Path(__file__).resolve().parent / "resultados"
+MINIMO_S = 0.005  # diferenças abaixo disso são ruído, mesmo que a razão seja grande
+
+def medir(funcao, repeticoes: int) -> dict:
+    tempos = []
+    for _ in range(repeticoes):
+        t0 = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - t0)
+    return {"min_s": round(min(tempos), 5), "mediana_s": round(statistics.median(tempos), 5), "repeticoes": repeticoes}
+
+# --------- CONSOLIDAÇÃO (dados.py) ---------
+def bench_consolidacao(pasta: Path, n_coops: int, participantes: int, repeticoes: int) -> dict:
+    corpus = pasta / "corpus"
+    if not corpus.exists():
+        gerar_corpus(corpus, n_coops, max(1, participantes // n_coops))
+    def rodar(**kwargs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            dados.main(raiz=corpus, **kwargs)
+    resultado = {"consolidacao": medir(rodar, repeticoes)}
+    rodar(incremental=True)  # 1ª incremental monta o cache; a medida é a de nada alterado
+    resultado["consolidacao_incremental"] = medir(lambda: rodar(incremental=True), repeticoes)
+    return resultado
+
+# --------- CARGA, FILTRO, AGREGAÇÃO E FIGURAS (o que o painel chama) ---------
+def carregar(xlsx: Path, versao: str):
+    # mesmo retorno do load_all_data do painel (que já chega com a versão dos dados calculada)
+    abas = dados.ler_sidecar(xlsx, versao, dados.ABAS_PAINEL)
+    return [abas[aba] for aba in dados.ABAS_PAINEL]
+
+def bench_dados(xlsx: Path, repeticoes: int, repeticoes_lentas: int) -> dict:
+    r = {}
+    r["carga_xlsx"] = medir(lambda: dados.preparar_abas(pd.read_excel(xlsx, sheet_name=None)), repeticoes_lentas)
+    with contextlib.redirect_stdout(io.StringIO()):
+        dados.gerar_sidecar(xlsx)
+    versao = dados.hash_arquivo(xlsx)
+    r["carga_colunar"] = medir(lambda: carregar(xlsx, versao), repeticoes)
+
+    comp, niv, fin, status, canc = carregar(xlsx, versao)
+    r["indice"] = medir(lambda: agregacoes.construir_indice(comp, niv, fin, status, canc), repeticoes)
+    indice = agregacoes.construir_indice(comp, niv, fin, status, canc)
+    # seleção típica da sidebar: 10% das cooperativas
+    selecao = indice["grupos"][::10]
+    grupos = frozenset(selecao)
+
+    def filtrar():
+        # o que o painel faz a cada clique na sidebar: fatias, níveis e KPIs da seleção
+        for nome, df in [("comparativo", comp), ("canceladas", canc)]:
+            agregacoes.fatiar(df, indice[nome], selecao)
+        return agregacoes.somar_niveis(indice["niveis"], selecao), agregacoes.calcular_kpis(indice, grupos)
+    r["filtro"] = medir(filtrar, repeticoes)
+
+    def agregar(chave):
+        pontuacao, medias = agregacoes.agregar_comparativo(indice["comparativo_parciais"], chave)
+        fin_sel = fin if chave is None else agregacoes.fatiar(fin, indice["financeiro"], chave)
+        return pontuacao, agregacoes.agregar_adesao(fin_sel, indice["comparativo_parciais"]["Participantes"]), medias
+    r["agregacao_todas"] = medir(lambda: agregar(None), repeticoes)
+    r["agregacao_selecao"] = medir(lambda: agregar(grupos), repeticoes)
+
+    def tabela():
+        texto = agregacoes.texto_busca(comp)
+        ordem = agregacoes.ordem_linhas(comp, "Pontuação Final", decrescente=True)
+        return agregacoes.fatia_pagina(agregacoes.selecionar_linhas(ordem, texto, "cliente 0001"), 1, 50)
+    r["tabela"] = medir(tabela, repeticoes)
+
+    perguntas = [p for p in PERGUNTAS if not p.startswith("Descreva")]
+    r["perfil_cubo"] = medir(lambda: agregacoes.construir_cubo_perfil(comp, perguntas), repeticoes)
+    cubos = agregacoes.construir_cubo_perfil(comp, perguntas)
+    def perfil():
+        for pergunta, cubo in cubos.items():
+            soma = agregacoes.somar_cubo(cubo, grupos)
+            agregacoes.contagem_respostas(soma, com_nivel=True)
+            agregacoes.niveis_por_resposta(soma, pergunta, dados.NIVEIS_ORDER)
+    r["perfil_selecao"] = medir(perfil, repeticoes)
+
+    niveis_sel, _ = filtrar()
+    pontuacao, adesao, medias = agregar(None)
+    construtores = [
+        lambda: graficos.fig_niveis(niveis_sel, "Seleção"),
+        lambda: graficos.fig_pontuacao(pontuacao, "Pontuação Final", medias.get("Pontuação Final")),
+        lambda: graficos.fig_pontuacao(pontuacao, "Evolução Detalhada (Inicial vs. Final)"),
+        lambda: graficos.fig_adesao(adesao, "Pontuação Final (Acumulado)"),
+    ]
+    r["figuras"] = medir(lambda: [c() for c in construtores], repeticoes)
+    figuras = [c() for c in construtores]
+    r["figuras_json"] = medir(lambda: [f.to_json() for f in figuras], repeticoes)
+    return r
+
+# --------- PAINEL INTEIRO (AppTest, headless) ---------
+def etapas_do_ultimo_rerun() -> dict:
+    # última linha gravada pelo instrumentacao (um arquivo por sessão; o AppTest abre uma sessão por instância)
+    arquivos = sorted(PASTA_TEMPOS.glob("*.jsonl"), key=lambda p: p.stat().st_mtime)
+    if not arquivos:
+        return {}
+    resumo = json.loads(arquivos[-1].read_text(encoding="utf-8").splitlines()[-1])
+    return {e["nome"]: e["ms"] for e in resumo["etapas"]}
+
+def bench_painel(pasta: Path, repeticoes: int, repeticoes_lentas: int) -> dict:
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+    painel = str(RAIZ / "painel.py")
+    anterior = Path.cwd()
+    os.chdir(pasta)  # o painel abre o master_resultados.xlsx da pasta atual
+    r, etapas = {}, {}
+    try:
+        def rodar(aba=None, selecao=None):
+            at = AppTest.from_file(painel, default_timeout=1800)
+            if aba is not None:
+                at.session_state["aba_ativa"] = aba
+            at.run()
+            if selecao is not None:
+                at.multiselect[0].set_value(selecao).run()
+            if at.exception:
+                raise RuntimeError(f"painel com erro: {at.exception[0].value}")
+            return at
+
+        def frio():
+            # sem caches do Streamlit, dados carregados nem cache colunar: o 1º acesso depois de um master novo
+            st.cache_data.clear(); st.cache_resource.clear(); recarga.descartar()
+            shutil.rmtree(dados.caminho_sidecar(pasta / dados.OUT_PATH.name), ignore_errors=True)
+            rodar()
+        r["painel_frio"] = medir(frio, repeticoes_lentas)
+        etapas["painel_frio"] = etapas_do_ultimo_rerun()
+        r["painel_morno"] = medir(rodar, repeticoes)
+        etapas["painel_morno"] = etapas_do_ultimo_rerun()
+        for aba in NOMES_ABAS:
+            st.cache_resource.clear()  # figuras/índices de tabela de novo; dados e agregados seguem em cache
+            rodar(aba)
+            etapas[f"aba {aba}"] = etapas_do_ultimo_rerun()
+            r[f"painel_aba {aba}"] = medir(lambda: rodar(aba), repeticoes)
+        grupos = rodar().multiselect[0].options
+        selecao = grupos[1::10] or grupos[1:2]
+        r["painel_filtro"] = medir(lambda: rodar(selecao=selecao), repeticoes)
+        etapas["painel_filtro"] = etapas_do_ultimo_rerun()
+    finally:
+        os.chdir(anterior)
+        recarga.descartar()  # a próxima escala é outro master: solta os dados e a thread deste
+    r["painel_etapas_ms"] = etapas
+    return r
+
+# --------- RESULTADOS ---------
+def metadados() -> dict:
+    import plotly, streamlit
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {"momento": time.strftime("%Y-%m-%dT%H:%M:%S"), "commit": commit, "python": platform.python_version(),
+            "pandas": pd.__version__, "streamlit": streamlit.__version__, "plotly": plotly.__version__,
+            "maquina": platform.node(), "cpus": os.cpu_count()}
+
+def comparar(base: dict, atual: dict, tolerancia: float) -> list[str]:
+    regressoes = []
+    print(f"\n📈 Comparação com {base['meta'].get('commit')} ({base['meta'].get('momento')}), tolerância {tolerancia:.0%}:")
+    for escala, medidas in atual["escalas"].items():
+        antes = base["escalas"].get(escala, {})
+        for nome, m in medidas.items():
+            if "min_s" not in m or "min_s" not in antes.get(nome, {}):
+                continue
+            a, b = antes[nome]["min_s"], m["min_s"]
+            razao = b / a if a else float("inf")
+            pior = razao > 1 + tolerancia and b - a > MINIMO_S
+            print(f"   {escala:<14} {nome:<40} {a:9.4f}s -> {b:9.4f}s  {razao:5.2f}x{'  ❌' if pior else ''}")
+            if pior:
+                regressoes.append(f"{escala} {nome}: {razao:.2f}x")
+    return regressoes
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks do dados.py e do painel.py com dados sintéticos")
+    parser.add_argument("--escalas", nargs="+", default=ESCALAS, metavar="COOPSxPARTICIPANTES",
+                        help=f"escalas a medir (padrão: {' '.join(ESCALAS)}; a maior suportada é 5000x1000000)")
+    parser.add_argument("--repeticoes", type=int, default=5, help="repetições das medidas rápidas (vale o mínimo)")
+    parser.add_argument("--repeticoes-lentas", type=int, default=1, help="repetições da consolidação, da carga do xlsx e do painel frio")
+    parser.add_argument("--sem-consolidacao", action="store_true", help="pula o dados.main() (gerar o corpus é o mais demorado)")
+    parser.add_argument("--sem-painel", action="store_true", help="pula as medidas com AppTest")
+    parser.add_argument("--dados", type=Path, default=None, help="reaproveita/gera os dados sintéticos nesta pasta")
+    parser.add_argument("--saida", type=Path, default=None, help="JSON do resultado (padrão: benchmarks/resultados/<data>_<commit>.json)")
+    parser.add_argument("--comparar", type=Path, default=None, help="JSON de uma execução anterior para comparar")
+    parser.add_argument("--tolerancia", type=float, default=0.25, help="piora relativa aceita no --comparar (padrão: 0.25)")
+    args = parser.parse_args()
+
+    base_dados = args.dados or Path(tempfile.mkdtemp(prefix="bench_suite_"))
+    resultado = {"meta": metadados(), "escalas": {}}
+    for escala in args.escalas:
+        n_coops, participantes = (int(x) for x in escala.lower().split("x"))
+        pasta = base_dados / escala
+        xlsx = pasta / dados.OUT_PATH.name
+        t0 = time.perf_counter()
+        if not xlsx.exists():
+            gerar_master(pasta, n_coops, participantes)
+        print(f"🧪 {escala}: master sintético pronto em {time.perf_counter() - t0:.1f}s")
+
+        medidas = {}
+        if not args.sem_consolidacao:
+            medidas.update(bench_consolidacao(pasta, n_coops, participantes, args.repeticoes_lentas))
+        medidas.update(bench_dados(xlsx, args.repeticoes, args.repeticoes_lentas))
+        if not args.sem_painel:
+            medidas.update(bench_painel(pasta, args.repeticoes, args.repeticoes_lentas))
+        resultado["escalas"][escala] = medidas
+        for nome, m in medidas.items():
+            if "min_s" in m:
+                print(f"   {nome:<40} {m['min_s']:9.4f}s (mediana {m['mediana_s']:.4f}s)")
+
+    saida = args.saida or PASTA_RESULTADOS / f"{time.strftime('%Y%m%d_%H%M%S')}_{resultado['meta']['commit'] or 'sem_git'}.json"
+    saida.parent.mkdir(parents=True, exist_ok=True)
+    saida.write_text(json.dumps(resultado, ensure_ascii=False, indent=1), encoding="utf-8")
+    print(f"💾 {saida}")
+    shutil.rmtree(PASTA_TEMPOS, ignore_errors=True)
+    if args.dados is None:
+        shutil.rmtree(base_dados, ignore_errors=True)
+
+    if args.comparar:
+        regressoes = comparar(json.loads(args.comparar.read_text(encoding="utf-8")), resultado, args.tolerancia)
+        if regressoes:
+            print("❌ Regressão:", "; ".join(regressoes))
+            raise SystemExit(1)
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+# Gera planilhas sintéticas de cooperativas no mesmo layout que o dados.py lê
+# (abas comparativo / resumo_niveis / financeiro_resumo).
+from pathlib import Path
+import argparse
+import random
+import pandas as pd
+
+NIVEIS = ["Básico", "Intermediário", "Avançado"]
+
+def nivel(pontos: int) -> str:
+    return NIVEIS[min(pontos // 34, 2)]
+
+def gerar_workbook(path: Path, grupo: str, rnd: random.Random, clientes: int) -> None:
+    linhas = []
+    for c in range(clientes):
+        ini = rnd.randint(0, 60); fim = rnd.randint(ini, 100)
+        linhas.append({
+            "Cliente": f"{grupo} CLIENTE {c:05d}",
+            "Pontuação Inicial": ini,
+            "Nível Inicial": nivel(ini),
+            "Pontuação Final": fim,
+            "Nível Final": nivel(fim),
+            "Evolução Absoluta": fim - ini,
+            "% de evolução": (fim - ini) / ini * 100.0 if ini else None,
+        })
+    comp = pd.DataFrame(linhas)
+    # cabeçalhos "fora do padrão" de propósito, para exercitar a normalização do dados.py
+    niv = pd.DataFrame({
+        "Nivel": NIVEIS,
+        "Qtd inicial": [sum(1 for l in linhas if l["Nível Inicial"] == n) for n in NIVEIS],
+        "Qtd final": [sum(1 for l in linhas if l["Nível Final"] == n) for n in NIVEIS],
+    })
+    soma_i = rnd.randint(0, 60); soma_f = soma_i + rnd.randint(0, 300)
+    fin = pd.DataFrame([{
+        "Bloco": "Gestão Financeira",
+        "Soma Inicial (todos)": soma_i,
+        "Soma Final (todos)": soma_f,
+        "Evolução Absoluta": soma_f - soma_i,
+        "% sobre Inicial": (soma_f - soma_i) / soma_i * 100.0 if soma_i else None,
+    }])
+    with pd.ExcelWriter(path, engine="openpyxl") as w:
+        comp.to_excel(w, sheet_name="comparativo", index=False)
+        niv.to_excel(w, sheet_name="resumo_niveis", index=False)
+        fin.to_excel(w, sheet_name="financeiro_resumo", index=False)
+
+def gerar_corpus(raiz: Path, n_coops: int, clientes_por_coop: int = 20, seed: int = 0) -> list[Path]:
+    # uma pasta por cooperativa, alternando os dois padrões de nome que o inferir_grupo entende
+    raiz = Path(raiz); rnd = random.Random(seed)
+    arquivos = []
+    for i in range(n_coops):
+        grupo = f"COOP{i:05d}"
+        pasta = raiz / f"lote_{i // 100:03d}" / grupo
+        pasta.mkdir(parents=True, exist_ok=True)
+        nome = f"{grupo}_resultados.xlsx" if i % 2 else f"resultado {grupo}.xlsx"
+        n = max(1, int(rnd.gauss(clientes_por_coop, clientes_por_coop / 4)))
+        gerar_workbook(pasta / nome, grupo, rnd, n)
+        arquivos.append(pasta / nome)
+    return arquivos
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera um corpus sintético de '*resultado*.xlsx'")
+    parser.add_argument("destino", type=Path)
+    parser.add_argument("--cooperativas", type=int, default=500)
+    parser.add_argument("--clientes", type=int, default=20, help="média de clientes por cooperativa")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    arqs = gerar_corpus(args.destino, args.cooperativas, args.clientes, args.seed)
+    print(f"✅ {len(arqs)} planilhas geradas em {args.destino}")
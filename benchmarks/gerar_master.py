@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+# Gera um master_resultados.xlsx sintético com as 7 abas que o painel lê (as 3 do dados.py + status,
+# canceladas e questionário, que hoje entram à mão), na escala pedida: 10 a 5.000 cooperativas,
+# até ~1 milhão de participantes. Vetorizado (numpy) para a escala grande não levar horas.
+from pathlib import Path
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import dados  # noqa: E402
+from agregacoes import total_financeiro, total_niveis  # noqa: E402
+from gerar_corpus import NIVEIS  # noqa: E402
+
+PERGUNTAS = {
+    "TEM SUCESSÃO FAMILIAR? (JOVENS INSERIDOS NO NEGÓCIO)": (["Sim", "Não"], [0.66, 0.34]),
+    "TEM MULHER NA GESTÃO DA PROPRIEDADE?": (["Não", "Sim"], [0.6, 0.4]),
+    "A PROPRIEDADE TRABALHA COM": (["Grãos", "Leite", "Leite e grãos", "Grãos e outras atividades",
+                                    "Leite e outras atividades", "Leite, Grãos e outras atividades"],
+                                   [0.36, 0.24, 0.23, 0.12, 0.035, 0.015]),
+    "Descreva as outras atividades (se tiver)": (["Pecuária de corte", "suinocultura", "Gado de corte", "Arroz e soja"],
+                                                 [0.75, 0.12, 0.08, 0.05]),
+    "Potencial para um nível 2 de trabalho?": (["Sim", "Não"], [0.72, 0.28]),
+}
+SEM_RESPOSTA = 0.2  # fração de participantes que não responderam o questionário (como no master real)
+
+def niveis_de(pontos: np.ndarray) -> np.ndarray:
+    return np.array(NIVEIS, dtype=object)[np.minimum(pontos // 34, 2)]
+
+def gerar_abas(n_coops: int, participantes: int, seed: int = 0) -> dict[str, pd.DataFrame]:
+    rng = np.random.default_rng(seed)
+    grupos = np.array([f"COOP{i:05d}" for i in range(n_coops)], dtype=object)
+    # tamanho das cooperativas bem desigual (lognormal), com pelo menos 1 participante cada
+    pesos = rng.lognormal(0, 0.8, n_coops)
+    tamanhos = np.maximum(1, np.round(pesos / pesos.sum() * participantes)).astype(int)
+    grupo = np.repeat(grupos, tamanhos)
+    n = len(grupo)
+    ordem_no_grupo = np.arange(n) - np.repeat(np.cumsum(tamanhos) - tamanhos, tamanhos)
+    cliente = np.char.add(np.char.add(grupo.astype(str), " CLIENTE "), np.char.zfill(ordem_no_grupo.astype(str), 6)).astype(object)
+
+    ini = rng.integers(0, 61, n)
+    fim = ini + (rng.random(n) * (101 - ini)).astype(int)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        evolucao = np.where(ini > 0, (fim - ini) / ini * 100.0, np.nan)
+    comparativo = pd.DataFrame({
+        "Grupo": grupo, "Cliente": cliente,
+        "Pontuação Inicial": ini, "Nível Inicial": niveis_de(ini),
+        "Pontuação Final": fim, "Nível Final": niveis_de(fim),
+        "Evolução Absoluta": fim - ini, "% de evolução": evolucao,
+    })
+
+    # níveis por cooperativa (as 3 linhas sempre) + TOTAL, na ordem que o dados.main grava
+    contagem = lambda col: (comparativo.groupby(["Grupo", col]).size().unstack(fill_value=0)
+                            .reindex(index=grupos, columns=NIVEIS, fill_value=0).stack())
+    niveis = pd.DataFrame({"Qtd Inicial": contagem("Nível Inicial"), "Qtd Final": contagem("Nível Final")})
+    niveis = niveis.rename_axis(["Grupo", "Nível"]).reset_index()
+    niveis = pd.concat([niveis, total_niveis(niveis)[niveis.columns]], ignore_index=True)
+
+    soma_i = rng.integers(0, 61, n_coops) * tamanhos // 20
+    soma_f = soma_i + rng.integers(0, 301, n_coops) * tamanhos // 20
+    financeiro = pd.DataFrame({"Grupo": grupos, "Bloco": "Gestão Financeira",
+                               "Soma Inicial (todos)": soma_i, "Soma Final (todos)": soma_f})
+    financeiro["Evolução Absoluta"] = financeiro["Soma Final (todos)"] - financeiro["Soma Inicial (todos)"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        financeiro["% sobre Inicial"] = np.where(financeiro["Soma Inicial (todos)"] > 0,
+                                                 financeiro["Evolução Absoluta"] / financeiro["Soma Inicial (todos)"] * 100.0, np.nan)
+    financeiro = pd.concat([financeiro, total_financeiro(financeiro)], ignore_index=True)
+    # colunas acrescentadas à mão no master real (quase sempre vazias; 'Soma Final ' com espaço no fim)
+    financeiro["Soma Inicial"] = np.nan
+    financeiro["Soma Final "] = np.nan
+
+    status = pd.DataFrame({"COOPERATIVA": grupos, "Quantidade de clientes": tamanhos, "Finalizados": tamanhos})
+
+    # canceladas: contagens esparsas (vazio = nenhum), 'TOTAL ' com o espaço do master real e a linha de total sem cooperativa
+    encontros = rng.poisson(0.4, (n_coops, len(dados.COLUNAS_ENCONTROS))).astype(float)
+    canceladas = pd.DataFrame(np.where(encontros > 0, encontros, np.nan), columns=dados.COLUNAS_ENCONTROS)
+    canceladas.insert(0, "COOPERATIVA", grupos)
+    canceladas["TOTAL "] = encontros.sum(axis=1).astype(int)
+    canceladas = pd.concat([canceladas, pd.DataFrame([{"TOTAL ": int(encontros.sum())}])], ignore_index=True)
+
+    # questionário: parte dos participantes sem resposta; nomes com caixa/espaços diferentes de vez em quando
+    respondeu = rng.random(n) >= SEM_RESPOSTA
+    questionario = pd.DataFrame({"COOPERATIVA": grupo[respondeu], "CLIENTE": cliente[respondeu]})
+    bagunca = rng.random(len(questionario)) < 0.05
+    questionario.loc[bagunca, "CLIENTE"] = questionario.loc[bagunca, "CLIENTE"].str.lower() + " "
+    for pergunta, (respostas, probs) in PERGUNTAS.items():
+        valores = rng.choice(np.array(respostas, dtype=object), len(questionario), p=probs)
+        vazias = rng.random(len(questionario)) < (0.85 if pergunta.startswith("Descreva") else 0.03)
+        questionario[pergunta] = np.where(vazias, None, valores)
+
+    return {
+        "comparativo_master": comparativo, "canceladas_detalhe": canceladas, "status_consultorias": status,
+        "niveis_master": niveis, "financeiro_master": financeiro, "questionario": questionario,
+    }
+
+def gerar_master(destino: Path, n_coops: int, participantes: int, seed: int = 0, sidecar: bool = False) -> Path:
+    # grava o xlsx (openpyxl write-only, como o dados.main); sidecar=True já deixa o cache colunar pronto
+    from openpyxl import Workbook
+    destino = Path(destino); destino.mkdir(parents=True, exist_ok=True)
+    xlsx = destino / dados.OUT_PATH.name
+    abas = gerar_abas(n_coops, participantes, seed)
+    wb = Workbook(write_only=True)
+    for nome, df in abas.items():
+        dados.gravar_aba(wb, nome, df)
+    wb.save(xlsx)
+    if sidecar:
+        dados.gerar_sidecar(xlsx, abas)
+    return xlsx
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera um master_resultados.xlsx sintético (todas as abas do painel)")
+    parser.add_argument("destino", type=Path, help="pasta onde gravar o master")
+    parser.add_argument("--cooperativas", type=int, default=200)
+    parser.add_argument("--participantes", type=int, default=5000, help="total de participantes (aprox.)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sidecar", action="store_true", help="também gera o cache colunar")
+    args = parser.parse_args()
+    t0 = time.perf_counter()
+    xlsx = gerar_master(args.destino, args.cooperativas, args.participantes, args.seed, args.sidecar)
+    print(f"✅ {xlsx} ({args.cooperativas} cooperativas, ~{args.participantes} participantes) em {time.perf_counter() - t0:.1f}s")
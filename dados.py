@@ -1,25 +1,208 @@
 # -*- coding: utf-8 -*-
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+import argparse
+import fnmatch
+import hashlib
+from datetime import datetime
+import io
+import json
+import os
 import re
+import shutil
+import tempfile
+import time
+from typing import Callable, Iterator
 import pandas as pd
 import numpy as np
 
+from agregacoes import PERGUNTAS_PERFIL, so_detalhe, total_financeiro, total_niveis
+from instrumentacao import Medidor
+
 # ====== RAIZ ONDE ESTÃO AS PASTAS/ARQUIVOS DE RESULTADOS ======
 ROOT_DIR = Path(r"C:\Users\ricardosa\Documents\docs relatórios ep\compilação")
 OUT_PATH = ROOT_DIR / "master_resultados.xlsx"
 # ===============================================================
 
-def achar_arquivos(root: Path) -> list[Path]:
-    # pega qualquer arquivo que contenha 'resultados' ou 'resultado' no nome
-    pats = ["**/*resultados*.xlsx", "**/*resultado*.xlsx"]
-    vistos, arquivos = set(), []
-    for pat in pats:
-        for p in root.glob(pat):
-            if p.is_file() and p.suffix.lower() == ".xlsx":
-                rp = p.resolve()
-                if rp not in vistos:
-                    vistos.add(rp)
-                    arquivos.append(p)
+# ====== CACHE DO MODO INCREMENTAL (--incremental) ======
+CACHE_DIRNAME = ".cache_consolidacao"
+MANIFESTO_NOME = "manifesto.json"
+# aumente quando mudar a forma de processar cada arquivo (invalida os caches antigos)
+VERSAO_CACHE = 3
+# ========================================================
+
+# ====== CACHE COLUNAR (FEATHER) AO LADO DO MASTER ======
+# master_resultados.xlsx -> master_resultados_colunar/v<esquema>-<sha1 do xlsx>/<aba>.feather + meta.json
+# Uma pasta por versão dos dados, publicada inteira de uma vez: as réplicas do painel no mesmo host
+# mapeiam (mmap) os mesmos arquivos só-leitura em vez de cada uma ler o xlsx e guardar a sua cópia.
+SIDECAR_SUFIXO = "_colunar"
+SIDECAR_META = "meta.json"
+NIVEIS_ORDER = ["Básico", "Intermediário", "Avançado"]
+# abas de respostas: toda coluna de texto vai sem espaços nas pontas, vazio vira NA e vira category
+ABAS_RESPOSTAS = {"questionario"}
+# aumente quando mudar a tipagem das abas ou o ESQUEMAS (invalida os caches colunares antigos)
+VERSAO_ESQUEMA = 9
+# comparativo ⟕ questionário, montado aqui (e não no painel) com chaves inteiras
+ABA_PARTICIPANTES = "participantes"
+ABA_RELATORIO_CHAVES = "participantes_relatorio"
+# problemas de esquema das abas do master (coluna obrigatória/aba ausente), para o painel mostrar
+ABA_AVISOS_ESQUEMA = "avisos_esquema"
+COLUNAS_ID = ["id_grupo", "id_cliente"]
+# abas que o painel carrega do cache colunar (as demais ficam no disco)
+ABAS_PAINEL = [ABA_PARTICIPANTES, "niveis_master", "financeiro_master", "status_consultorias", "canceladas_detalhe"]
+# ========================================================
+
+# ====== ESQUEMA DAS ABAS: nome canônico -> apelidos, tipo, obrigatória ======
+# Aplicado uma vez, na consolidação: nas abas de cada arquivo de resultado (normalizar_colunas, na leitura)
+# e nas abas do master (tipar_aba, ao gerar o cache colunar). O painel recebe as colunas já com o nome,
+# o tipo e a presença garantidos, e não precisa conferir nada a cada rerun.
+#  • apelidos: padrões (como os do --incluir, sem diferenciar maiúsculas) para o nome da coluna sem espaços
+#    sobrando; o nome canônico sempre vale. A 1ª coluna ainda não usada que casar é renomeada.
+#  • tipo: "texto" (str) | "categoria" | "nivel" (categoria ordenada por NIVEIS_ORDER) | "numero"
+#  • obrigatória ausente = aviso (e a coluna entra com 'padrao'); no master toda coluna do esquema existe
+#  • padrao: valor das células vazias no master; preencher: coluna (declarada antes) que cobre as vazias
+def coluna(tipo: str, apelidos: tuple = (), obrigatoria: bool = False, padrao=None, preencher: str | None = None) -> dict:
+    return {"tipo": tipo, "apelidos": list(apelidos), "obrigatoria": obrigatoria, "padrao": padrao, "preencher": preencher}
+
+COLUNAS_ENCONTROS = ["1 Encontro realizado", "2 Encontros realizados", "3 Encontros realizados", "4 Encontros realizados"]
+_COMPARATIVO = {
+    # Cliente é texto e não category: quase única por linha, a categoria seria remontada na memória de
+    # cada processo; como texto, a coluna sai do arquivo mapeado sem cópia
+    "Cliente": coluna("texto", obrigatoria=True),
+    "Pontuação Inicial": coluna("numero", obrigatoria=True),
+    "Nível Inicial": coluna("nivel", obrigatoria=True),
+    "Pontuação Final": coluna("numero", obrigatoria=True),
+    "Nível Final": coluna("nivel", obrigatoria=True),
+    "Evolução Absoluta": coluna("numero"),
+    "% de evolução": coluna("numero"),
+}
+_NIVEIS = {
+    "Nível": coluna("nivel", ("*nível*", "*nivel*"), obrigatoria=True),
+    "Qtd Inicial": coluna("numero", ("*inicial*",), obrigatoria=True, padrao=0),
+    "Qtd Final": coluna("numero", ("*final*",), obrigatoria=True, padrao=0),
+}
+_FINANCEIRO = {
+    "Bloco": coluna("categoria"),
+    "Soma Inicial (todos)": coluna("numero", obrigatoria=True, padrao=0.0),
+    "Soma Final (todos)": coluna("numero", obrigatoria=True, padrao=0.0),
+    "Evolução Absoluta": coluna("numero"),
+    "% sobre Inicial": coluna("numero"),
+}
+ESQUEMAS = {
+    # abas de cada arquivo de resultado
+    "comparativo": _COMPARATIVO,
+    "resumo_niveis": _NIVEIS,
+    "financeiro_resumo": _FINANCEIRO,
+    # abas do master (as três consolidadas + as que entram à mão)
+    "comparativo_master": {"Grupo": coluna("categoria", obrigatoria=True), **_COMPARATIVO},
+    "niveis_master": {"Grupo": coluna("categoria", obrigatoria=True), **_NIVEIS},
+    "financeiro_master": {
+        "Grupo": coluna("categoria", obrigatoria=True), **_FINANCEIRO,
+        # acrescentadas à mão no master, quase sempre vazias
+        "Soma Inicial": coluna("numero", preencher="Soma Inicial (todos)"),
+        "Soma Final": coluna("numero", preencher="Evolução Absoluta"),
+    },
+    "status_consultorias": {
+        "COOPERATIVA": coluna("categoria", obrigatoria=True),
+        "Quantidade de clientes": coluna("numero", obrigatoria=True, padrao=0),
+        "Finalizados": coluna("numero", padrao=0),
+    },
+    "canceladas_detalhe": {
+        "COOPERATIVA": coluna("categoria", obrigatoria=True),
+        **{c: coluna("numero") for c in COLUNAS_ENCONTROS},
+        "TOTAL": coluna("numero", obrigatoria=True, padrao=0),
+    },
+    "questionario": {
+        "COOPERATIVA": coluna("categoria", obrigatoria=True),
+        "CLIENTE": coluna("texto", obrigatoria=True),
+        # perguntas da aba Análise por Perfil: sempre no master (vazias quando não vieram), não obrigatórias
+        **{pergunta: coluna("categoria") for pergunta in PERGUNTAS_PERFIL},
+    },
+}
+ABAS_MASTER = ["comparativo_master", "niveis_master", "financeiro_master", "status_consultorias",
+               "canceladas_detalhe", "questionario"]
+# abas com linhas de total (chave vazia ou 'TOTAL') -> coluna da chave. O xlsx mantém essas linhas
+# (quem abre no Excel as usa); o cache colunar e o painel ficam só com o detalhe e somam na hora
+ABAS_COM_TOTAL = {"niveis_master": "Grupo", "financeiro_master": "Grupo",
+                  "status_consultorias": "COOPERATIVA", "canceladas_detalhe": "COOPERATIVA"}
+# ========================================================
+
+# ====== DESCOBERTA DOS ARQUIVOS (uma passada, com cache da listagem das pastas) ======
+# padrões de nome (fnmatch, sem diferenciar maiúsculas); 'excluir' vale para arquivos e pastas
+PADROES_INCLUIR = ["*resultado*.xlsx"]  # também cobre '*resultados*.xlsx'
+PADROES_EXCLUIR = ["~$*", CACHE_DIRNAME, "*" + SIDECAR_SUFIXO]  # lock do Office aberto, caches do próprio dados.py
+LISTAGEM_NOME = "listagem.json"  # dentro de <raiz>/CACHE_DIRNAME
+
+def compilar_padroes(padroes: list[str]) -> re.Pattern:
+    # uma regex só para a lista toda (lista vazia não casa com nada)
+    return re.compile("|".join(fnmatch.translate(p) for p in padroes) or "(?!)", flags=re.IGNORECASE)
+
+def listar_pasta(pasta: Path, mtime: int, incluir: re.Pattern) -> dict | None:
+    # entradas diretas da pasta: arquivos que batem com 'incluir' + todas as subpastas (links de pasta
+    # não são seguidos, como no glob '**'). None se a pasta não puder ser lida
+    arquivos, pastas = [], []
+    try:
+        with os.scandir(pasta) as it:
+            for e in it:
+                try:
+                    if e.is_dir(follow_symlinks=False):
+                        pastas.append(e.name)
+                    elif incluir.match(e.name) and e.is_file():
+                        arquivos.append(e.name)
+                except OSError:
+                    continue
+    except OSError:
+        return None
+    return {"mtime": mtime, "arquivos": sorted(arquivos), "pastas": sorted(pastas)}
+
+def carregar_listagem(cache_path: Path, incluir: list[str]) -> dict:
+    # listagem feita com outros padrões de inclusão não serve: começa do zero
+    try:
+        listagem = json.loads(cache_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if listagem.get("incluir") != incluir:
+        return {}
+    return listagem.get("pastas", {})
+
+def salvar_listagem(cache_path: Path, incluir: list[str], pastas: dict) -> None:
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = cache_path.with_name(cache_path.name + ".tmp")
+    tmp.write_text(json.dumps({"incluir": incluir, "pastas": pastas}, ensure_ascii=False), encoding="utf-8")
+    tmp.replace(cache_path)
+
+def achar_arquivos(root: Path, incluir: list[str] = PADROES_INCLUIR, excluir: list[str] = PADROES_EXCLUIR,
+                   cache_path: Path | None = None, podar_antes: float | None = None) -> list[Path]:
+    # Uma passada só pela árvore (os.scandir). Com 'cache_path', a listagem de cada pasta fica guardada
+    # junto com o mtime dela: pasta com o mesmo mtime (nada criado/apagado/renomeado nela) custa só um stat.
+    # 'podar_antes' (timestamp): pasta do cache sem alteração desde então é aceita com tudo o que há
+    # embaixo dela, sem tocar no disco (para compartilhamentos de rede com muitas pastas antigas)
+    antigo = carregar_listagem(cache_path, incluir) if cache_path is not None else {}
+    re_incluir, re_excluir = compilar_padroes(incluir), compilar_padroes(excluir)
+    novo, arquivos = {}, []
+    pilha = [("", False)]  # (pasta relativa à raiz, dentro de uma pasta podada)
+    while pilha:
+        rel, podada = pilha.pop()
+        pasta = root / rel
+        entrada = antigo.get(rel)
+        if not podada or entrada is None:
+            podada = False
+            try:
+                mtime = os.stat(pasta).st_mtime_ns
+            except OSError:
+                continue
+            if entrada is None or entrada["mtime"] != mtime:
+                entrada = listar_pasta(pasta, mtime, re_incluir)
+                if entrada is None:
+                    continue
+            elif podar_antes is not None and mtime < podar_antes * 1e9:
+                podada = True
+        novo[rel] = entrada
+        arquivos += [pasta / nome for nome in entrada["arquivos"] if not re_excluir.match(nome)]
+        pilha += [(f"{rel}/{nome}" if rel else nome, podada) for nome in entrada["pastas"] if not re_excluir.match(nome)]
+
+    if cache_path is not None:
+        salvar_listagem(cache_path, incluir, novo)
     return sorted(arquivos, key=lambda x: x.as_posix().lower())
 
 def inferir_grupo(path: Path) -> str:
@@ -29,105 +212,753 @@ def inferir_grupo(path: Path) -> str:
     if m: return m.group(1)
     return path.parent.name
 
-def ler_abas(path: Path) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
-    comp = niv = fin = pd.DataFrame()
-    try: comp = pd.read_excel(path, sheet_name="comparativo", engine="openpyxl")
-    except Exception: pass
-    try: niv  = pd.read_excel(path, sheet_name="resumo_niveis", engine="openpyxl")
-    except Exception: pass
-    try: fin  = pd.read_excel(path, sheet_name="financeiro_resumo", engine="openpyxl")
-    except Exception: pass
-    return comp, niv, fin
-
-def main():
-    arquivos = achar_arquivos(ROOT_DIR)
+# ====== APLICAÇÃO DO ESQUEMA (ver ESQUEMAS) ======
+def nome_limpo(c) -> str:
+    return " ".join(str(c).split())
+
+def padroes_coluna(nome: str, spec: dict) -> re.Pattern:
+    # nome canônico (literal) + apelidos, num regex só
+    return re.compile(f"(?:{re.escape(nome)}$)|{compilar_padroes(spec['apelidos']).pattern}", re.IGNORECASE)
+
+def casar_colunas(colunas, aba: str) -> dict:
+    # {coluna como veio: nome canônico}; o nome canônico exato tem prioridade sobre os apelidos
+    livres = list(colunas)
+    renomear = {}
+    for nome, spec in ESQUEMAS.get(aba, {}).items():
+        casa = padroes_coluna(nome, spec)
+        exatas = [c for c in livres if nome_limpo(c).casefold() == nome.casefold()]
+        achadas = exatas or [c for c in livres if casa.match(nome_limpo(c))]
+        if achadas:
+            livres.remove(achadas[0])
+            if achadas[0] != nome:
+                renomear[achadas[0]] = nome
+    return renomear
+
+def normalizar_colunas(df: pd.DataFrame, aba: str) -> tuple[pd.DataFrame, list[str]]:
+    # nomes canônicos + números como número (o que não for vira vazio) + obrigatórias ausentes com o 'padrao'.
+    # As demais colunas ficam como vieram. Devolve (df, problemas encontrados)
+    df = df.rename(columns=casar_colunas(df.columns, aba))
+    problemas = []
+    for nome, spec in ESQUEMAS.get(aba, {}).items():
+        if nome not in df.columns:
+            if spec["obrigatoria"]:
+                problemas.append(f"coluna obrigatória '{nome}' ausente")
+                df[nome] = np.nan if spec["padrao"] is None else spec["padrao"]
+        elif spec["tipo"] == "numero" and not pd.api.types.is_numeric_dtype(df[nome]):
+            df[nome] = pd.to_numeric(df[nome], errors="coerce")
+    return df, problemas
+
+def usa_coluna(aba: str):
+    # filtro do usecols: só as colunas do esquema da aba (nome canônico ou apelido)
+    padroes = [padroes_coluna(nome, spec) for nome, spec in ESQUEMAS[aba].items()]
+    return lambda c: any(p.match(nome_limpo(c)) for p in padroes)
+
+# abas lidas de cada arquivo de resultado; resumo_niveis só precisa das colunas de nível e quantidades
+ABAS_ENTRADA = ["comparativo", "resumo_niveis", "financeiro_resumo"]
+COLUNAS_ENTRADA = {"resumo_niveis": usa_coluna("resumo_niveis")}
+
+# (comparativo, resumo_niveis, financeiro_resumo, avisos) de um arquivo
+Abas = tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, list[dict]]
+
+def ler_abas(path: Path) -> Abas:
+    # abre o arquivo uma vez só (openpyxl em modo read-only) e lê as três abas dele;
+    # o que faltar/der erro vira aviso {"arquivo", "aba", "problema"} em vez de sumir calado
+    frames = {aba: pd.DataFrame() for aba in ABAS_ENTRADA}
+    avisos = []
+    try:
+        with pd.ExcelFile(path, engine="openpyxl") as xls:
+            presentes = set(xls.sheet_names)
+            for aba in ABAS_ENTRADA:
+                if aba not in presentes:
+                    avisos.append({"arquivo": str(path), "aba": aba, "problema": "ausente"})
+                    continue
+                try:
+                    df = xls.parse(aba, usecols=COLUNAS_ENTRADA.get(aba))
+                except Exception as e:
+                    avisos.append({"arquivo": str(path), "aba": aba, "problema": f"erro ao ler: {e}"})
+                    continue
+                if df.empty:
+                    avisos.append({"arquivo": str(path), "aba": aba, "problema": "vazia"})
+                frames[aba] = df
+    except Exception as e:
+        avisos += [{"arquivo": str(path), "aba": aba, "problema": f"arquivo ilegível: {e}"} for aba in ABAS_ENTRADA]
+    return frames["comparativo"], frames["resumo_niveis"], frames["financeiro_resumo"], avisos
+
+def processar_arquivo(p: Path) -> Abas:
+    # lê as três abas de um arquivo e já deixa as colunas no formato do master (ESQUEMAS)
+    grupo = inferir_grupo(p).strip()
+    comp, niv, fin, avisos = ler_abas(p)
+    prontas = []
+    for aba, df in zip(ABAS_ENTRADA, (comp, niv, fin)):
+        if not df.empty:
+            df, problemas = normalizar_colunas(df, aba)
+            avisos += [{"arquivo": str(p), "aba": aba, "problema": problema, "mantida": True} for problema in problemas]
+            df.insert(0, "Grupo", grupo)
+        prontas.append(df)
+    return *prontas, avisos
+
+def processar_medido(p: Path) -> tuple[Abas, float]:
+    # mede o parse onde ele acontece (no worker, quando há vários processos)
+    inicio = time.perf_counter()
+    abas = processar_arquivo(p)
+    return abas, time.perf_counter() - inicio
+
+# ====== MODO INCREMENTAL: MANIFESTO + CACHE DAS ABAS POR ARQUIVO ======
+def hash_arquivo(path: Path, bloco: int = 1 << 20) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for pedaco in iter(lambda: f.read(bloco), b""):
+            h.update(pedaco)
+    return h.hexdigest()
+
+def carregar_manifesto(cache_dir: Path) -> dict:
+    # manifesto de outra versão do processamento não serve: começa do zero
+    try:
+        manifesto = json.loads((cache_dir / MANIFESTO_NOME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if manifesto.get("versao") != VERSAO_CACHE:
+        return {}
+    return manifesto.get("arquivos", {})
+
+def salvar_manifesto(cache_dir: Path, entradas: dict) -> None:
+    tmp = cache_dir / (MANIFESTO_NOME + ".tmp")
+    tmp.write_text(json.dumps({"versao": VERSAO_CACHE, "arquivos": entradas}, ensure_ascii=False, indent=1), encoding="utf-8")
+    tmp.replace(cache_dir / MANIFESTO_NOME)
+
+def anotar_tempos(arquivos: list[Path], medidos, tempos: dict | None) -> Iterator[Abas]:
+    for p, (abas, segundos) in zip(arquivos, medidos):
+        if tempos is not None:
+            tempos[p] = ("lido", segundos)
+        yield abas
+
+def iterar_arquivos(arquivos: list[Path], workers: int = 1, tempos: dict | None = None) -> Iterator[Abas]:
+    # um arquivo por vez, na ordem da entrada (quem consome não precisa guardar todos na memória);
+    # workers > 1: distribui o parse entre processos. 'tempos' recebe {arquivo: (origem, segundos do parse)}
+    if workers <= 1 or len(arquivos) <= 1:
+        yield from anotar_tempos(arquivos, map(processar_medido, arquivos), tempos)
+        return
+    workers = min(workers, len(arquivos))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        medidos = pool.map(processar_medido, arquivos, chunksize=max(1, len(arquivos) // (workers * 4)))
+        yield from anotar_tempos(arquivos, medidos, tempos)
+
+def ler_incremental(arquivos: list[Path], cache_dir: Path, workers: int = 1, tempos: dict | None = None) -> Iterator[Abas]:
+    # só relê os arquivos novos/alterados; o resto vem do cache (.pkl) de cada arquivo.
+    # Entrega um arquivo por vez, na ordem da entrada; manifesto e limpeza no fim da iteração
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    antigo = carregar_manifesto(cache_dir)
+    novo, plano, pendentes = {}, [], []
+
+    for p in arquivos:
+        chave = p.resolve().as_posix()
+        info = p.stat()
+        entrada = antigo.get(chave)
+        cache_path = cache_dir / (hashlib.sha1(chave.encode("utf-8")).hexdigest()[:20] + ".pkl")
+
+        reaproveita, conteudo = False, None
+        if entrada and cache_path.exists():
+            mesmo_stat = entrada["mtime"] == info.st_mtime_ns and entrada["tamanho"] == info.st_size
+            # mtime mudou mas o conteúdo não (cópia, checkout...): confere pelo hash
+            if not mesmo_stat:
+                conteudo = hash_arquivo(p)
+            reaproveita = mesmo_stat or entrada["hash"] == conteudo
+        if reaproveita:
+            novo[chave] = {**entrada, "mtime": info.st_mtime_ns, "tamanho": info.st_size}
+        else:
+            # o hash da conferência acima, quando houve (cada arquivo alterado é lido uma vez só para o hash)
+            novo[chave] = {"mtime": info.st_mtime_ns, "tamanho": info.st_size, "hash": conteudo or hash_arquivo(p),
+                           "cache": cache_path.name}
+            pendentes.append(p)
+        plano.append((p, cache_path, reaproveita))
+
+    # os pendentes saem do leitor na mesma ordem relativa em que aparecem no plano
+    lidos = iterar_arquivos(pendentes, workers, tempos)
+    relidos = 0
+    for p, cache_path, reaproveita in plano:
+        abas = None
+        inicio = time.perf_counter()
+        if reaproveita:
+            try:
+                abas = pd.read_pickle(cache_path)
+                if tempos is not None:
+                    tempos[p] = ("cache", time.perf_counter() - inicio)
+            except Exception:
+                abas = None
+        if abas is None:
+            # pendente (vem do leitor) ou cache ilegível (relê o arquivo aqui mesmo)
+            if reaproveita:
+                abas, segundos = processar_medido(p)
+                if tempos is not None:
+                    tempos[p] = ("lido", segundos)
+            else:
+                abas = next(lidos)
+            pd.to_pickle(abas, cache_path)
+            relidos += 1
+        yield abas
+
+    # arquivos que sumiram da pasta: apaga o cache e some do master
+    removidos = [k for k in antigo if k not in novo]
+    for k in removidos:
+        (cache_dir / antigo[k]["cache"]).unlink(missing_ok=True)
+
+    salvar_manifesto(cache_dir, novo)
+    print(f"♻️ Incremental: {len(arquivos) - relidos} reaproveitado(s), {relidos} relido(s), {len(removidos)} removido(s)")
+
+# ====== GRAVAÇÃO DO MASTER (openpyxl write-only: linha a linha, sem o modelo inteiro na memória) ======
+def escrever_cabecalho(ws, colunas: list[str]):
+    # mesmo visual do cabeçalho do pandas.to_excel (negrito, borda fina, centralizado)
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Alignment, Border, Font, Side
+    fina = Side(style="thin")
+    celulas = []
+    for c in colunas:
+        cel = WriteOnlyCell(ws, value=str(c))
+        cel.font = Font(bold=True)
+        cel.border = Border(left=fina, right=fina, top=fina, bottom=fina)
+        cel.alignment = Alignment(horizontal="center", vertical="top")
+        celulas.append(cel)
+    ws.append(celulas)
+
+def anexar_linhas(ws, df: pd.DataFrame):
+    # NaN/NA viram célula vazia, como no to_excel
+    for linha in df.astype(object).where(df.notna(), None).itertuples(index=False, name=None):
+        ws.append(linha)
+
+def gravar_aba(wb, nome: str, df: pd.DataFrame):
+    ws = wb.create_sheet(nome)
+    escrever_cabecalho(ws, list(df.columns))
+    anexar_linhas(ws, df)
+
+def main(incremental: bool = False, raiz: Path | None = None, workers: int = 1,
+         incluir: list[str] | None = None, excluir: list[str] | None = None, podar_dias: float | None = None):
+    raiz = Path(raiz) if raiz is not None else ROOT_DIR
+    out_path = OUT_PATH if raiz == ROOT_DIR else raiz / OUT_PATH.name
+    # tempo e pico de memória por fase + parse/linhas/bytes por arquivo (ver gravar_relatorio)
+    medidor = Medidor(sessao=datetime.now().strftime("%Y%m%d_%H%M%S"), perfil="", memoria=True)
+    medidor.contexto.update(raiz=str(raiz), incremental=incremental, workers=workers)
+
+    # o próprio master também casa com '*resultados*.xlsx': fica fora da entrada
+    with medidor.etapa("descoberta"):
+        podar_antes = time.time() - podar_dias * 86400 if podar_dias is not None else None
+        achados = achar_arquivos(raiz, incluir or PADROES_INCLUIR, PADROES_EXCLUIR + (excluir or []),
+                                 cache_path=raiz / CACHE_DIRNAME / LISTAGEM_NOME, podar_antes=podar_antes)
+        arquivos = [p for p in achados if p.resolve() != out_path.resolve()]
     if not arquivos:
-        print(f"⚠️ Nenhum '*resultado*.xlsx' encontrado em {ROOT_DIR}")
+        print(f"⚠️ Nenhum '*resultado*.xlsx' encontrado em {raiz}")
         return
 
-    comps, nives, fins = [], [], []
+    nives, fins = [], []
 
     print("🔎 Encontrados:")
     for p in arquivos:
         print(" •", p)
 
-    for p in arquivos:
-        grupo = inferir_grupo(p).strip()
-        comp, niv, fin = ler_abas(p)
+    tempos, por_arquivo = {}, []
+    if incremental:
+        resultados = ler_incremental(arquivos, raiz / CACHE_DIRNAME, workers, tempos)
+    else:
+        resultados = iterar_arquivos(arquivos, workers, tempos)
 
-        if not comp.empty:
-            comp = comp.copy(); comp.insert(0, "Grupo", grupo); comps.append(comp)
-        else:
-            print(f"↪️ {p.name}: aba 'comparativo' ausente (pulando)")
-
-        if not niv.empty:
-            niv = niv.copy(); niv.insert(0, "Grupo", grupo)
-            if "Nível" not in niv.columns:
-                poss = [c for c in niv.columns if "nível" in str(c).lower() or "nivel" in str(c).lower()]
-                if poss: niv = niv.rename(columns={poss[0]: "Nível"})
-            if "Qtd Inicial" not in niv.columns:
-                poss = [c for c in niv.columns if "inicial" in str(c).lower()]
-                if poss: niv = niv.rename(columns={poss[0]: "Qtd Inicial"})
-            if "Qtd Final" not in niv.columns:
-                poss = [c for c in niv.columns if "final" in str(c).lower()]
-                if poss: niv = niv.rename(columns={poss[0]: "Qtd Final"})
-            nives.append(niv)
-        else:
-            print(f"↪️ {p.name}: aba 'resumo_niveis' ausente (pulando)")
+    # comparativo (a aba grande): cada arquivo vai para um .pkl temporário assim que é lido, e só a
+    # união das colunas fica na memória; níveis/financeiro são poucas linhas por arquivo e ficam em listas
+    with tempfile.TemporaryDirectory(prefix="consolidacao_") as tmp:
+        partes_comp, colunas_comp = [], []
+        with medidor.etapa("leitura"):
+            # strict: esgota o leitor incremental, que grava o manifesto ao terminar
+            for p, (comp, niv, fin, avisos) in zip(arquivos, resultados, strict=True):
+                if not comp.empty:
+                    parte = Path(tmp) / f"{len(partes_comp):06d}.pkl"
+                    comp.to_pickle(parte)
+                    partes_comp.append(parte)
+                    colunas_comp += [c for c in comp.columns if c not in colunas_comp]
+                if not niv.empty: nives.append(niv)
+                if not fin.empty: fins.append(fin)
+                for a in avisos:
+                    print(f"↪️ {p.name}: aba '{a['aba']}' {a['problema']}" + ("" if a.get("mantida") else " (pulando)"))
+                por_arquivo.append(registro_arquivo(p, tempos.get(p, (None, None)), comp, niv, fin, avisos))
+
+        if not partes_comp and not nives and not fins:
+            print("❌ Nada para consolidar.")
+            return
+
+        with medidor.etapa("consolidação (níveis, financeiro, TOTAL)"):
+            # ===== niveis_master + TOTAL
+            if nives:
+                niv_master = pd.concat(nives, ignore_index=True)
+                total_geral = total_niveis(niv_master)
+                order = pd.CategoricalDtype(NIVEIS_ORDER, ordered=True)
+                niv_master["Nível"] = niv_master["Nível"].astype(order)
+                niv_master = niv_master.sort_values(["Grupo","Nível"], na_position="last")
+                niv_master_full = pd.concat([niv_master, total_geral], ignore_index=True)
+            else:
+                niv_master_full = pd.DataFrame(columns=["Grupo","Nível","Qtd Inicial","Qtd Final"])
+
+            # ===== financeiro_master + TOTAL
+            if fins:
+                fin_master = pd.concat(fins, ignore_index=True)
+                fin_master_full = pd.concat([fin_master, total_financeiro(fin_master)], ignore_index=True)
+            else:
+                fin_master_full = pd.DataFrame(columns=["Grupo","Bloco","Soma Inicial (todos)","Soma Final (todos)","Evolução Absoluta","% sobre Inicial"])
+
+        # ===== gravação: comparativo parte a parte, depois níveis e financeiro (já com as linhas TOTAL)
+        with medidor.etapa("gravação xlsx"):
+            from openpyxl import Workbook
+            wb = Workbook(write_only=True)
+            if partes_comp:
+                ws = wb.create_sheet("comparativo_master")
+                escrever_cabecalho(ws, colunas_comp)
+                for parte in partes_comp:
+                    anexar_linhas(ws, pd.read_pickle(parte).reindex(columns=colunas_comp))
+            if not niv_master_full.empty:  gravar_aba(wb, "niveis_master", niv_master_full)
+            if not fin_master_full.empty:  gravar_aba(wb, "financeiro_master", fin_master_full)
+            wb.save(out_path)
+
+        print(f"✅ Consolidado salvo em: {out_path}")
+
+        # o cache colunar recebe o comparativo parte a parte (as mesmas partes do xlsx), sem juntá-lo na memória
+        with medidor.etapa("cache colunar"):
+            abas = {"niveis_master": niv_master_full, "financeiro_master": fin_master_full}
+            if partes_comp:
+                gerar_sidecar(out_path, abas, comparativo_em_partes=lambda: (
+                    pd.read_pickle(parte).reindex(columns=colunas_comp) for parte in partes_comp))
+            else:
+                gerar_sidecar(out_path, {"comparativo_master": pd.DataFrame(), **abas})
+
+    gravar_relatorio(out_path, medidor.finalizar(), por_arquivo)
+
+# ====== RELATÓRIO DA EXECUÇÃO (ao lado do master) ======
+#  • <master>_execucao.json: fases (tempo, pico de RSS) + um registro por arquivo, da última execução;
+#  • <master>_arquivos.csv: os registros por arquivo (abre no Excel para achar os mais lentos/maiores);
+#  • <master>_execucoes.jsonl: uma linha de resumo por execução, acumulada, para acompanhar a tendência
+def registro_arquivo(p: Path, tempo: tuple, comp: pd.DataFrame, niv: pd.DataFrame, fin: pd.DataFrame, avisos: list[dict]) -> dict:
+    origem, segundos = tempo
+    problemas = {}
+    for a in avisos:
+        problemas[a["aba"]] = "; ".join(filter(None, [problemas.get(a["aba"]), a["problema"]]))
+    registro = {
+        "arquivo": str(p),
+        "grupo": inferir_grupo(p).strip(),
+        "origem": origem,  # "lido" (parse do xlsx) ou "cache" (modo incremental)
+        "parse_s": None if segundos is None else round(segundos, 3),
+        "bytes": p.stat().st_size,
+        "linhas_comparativo": len(comp),
+        "linhas_niveis": len(niv),
+        "linhas_financeiro": len(fin),
+    }
+    registro.update({f"aba_{aba}": problemas.get(aba, "ok") for aba in ABAS_ENTRADA})
+    return registro
+
+def gravar_relatorio(out_path: Path, resumo: dict, por_arquivo: list[dict]):
+    base = out_path.with_suffix("")
+    resumo.pop("perfil", None)  # sem perfilador no dados.py
+    (base.parent / f"{base.name}_execucao.json").write_text(
+        json.dumps({**resumo, "arquivos": por_arquivo}, ensure_ascii=False, indent=1), encoding="utf-8")
+    pd.DataFrame(por_arquivo).to_csv(base.parent / f"{base.name}_arquivos.csv", index=False, encoding="utf-8-sig")
+
+    lidos = [r for r in por_arquivo if r["origem"] == "lido"]
+    linha = {
+        "momento": resumo["momento"],
+        "total_s": round(resumo["total_ms"] / 1000, 2),
+        "fases_s": {e["nome"]: round(e["ms"] / 1000, 2) for e in resumo["etapas"]},
+        "pico_mb": resumo["pico_mb"],
+        "pico_workers_mb": resumo["pico_filhos_mb"] if resumo["contexto"]["workers"] > 1 else None,
+        "arquivos": len(por_arquivo),
+        "lidos": len(lidos),
+        "bytes": sum(r["bytes"] for r in por_arquivo),
+        "linhas_comparativo": sum(r["linhas_comparativo"] for r in por_arquivo),
+        **resumo["contexto"],
+    }
+    with open(base.parent / f"{base.name}_execucoes.jsonl", "a", encoding="utf-8") as f:
+        f.write(json.dumps(linha, ensure_ascii=False) + "\n")
+
+    fases = ", ".join(f"{nome} {seg:.1f}s" for nome, seg in linha["fases_s"].items())
+    print(f"⏱️ {linha['total_s']:.1f}s ({fases}); pico de memória: {linha['pico_mb']} MB")
+    if lidos:
+        lento = max(lidos, key=lambda r: r["parse_s"])
+        print(f"🐢 Mais lento: {Path(lento['arquivo']).name} ({lento['parse_s']:.2f}s, {lento['bytes'] / 2**20:.1f} MB)")
+    print(f"📊 Relatório da execução: {base.parent / (base.name + '_execucao.json')}")
+
+# ====== PARTICIPANTES: COMPARATIVO + QUESTIONÁRIO ======
+def normalizar_chave(serie: pd.Series) -> pd.Series:
+    # só para casar as chaves: sem espaços nas pontas/duplicados e sem diferença de maiúsculas
+    return serie.astype("string").str.strip().str.replace(r"\s+", " ", regex=True).str.casefold()
+
+def montar_participantes(comparativo: pd.DataFrame, questionario: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    # uma linha por linha do comparativo + respostas do questionário (1ª ocorrência de cada Grupo/Cliente).
+    # Grupo/Cliente viram ids inteiros (id_grupo/id_cliente) num dicionário comum às duas abas.
+    # Devolve (participantes, relatório das chaves sem par / duplicadas)
+    quest = questionario.rename(columns={"COOPERATIVA": "Grupo", "CLIENTE": "Cliente"})
+    ids_c, ids_q, tamanhos = {}, {}, {}
+    for col, id_col in zip(["Grupo", "Cliente"], COLUNAS_ID):
+        norm_c, norm_q = normalizar_chave(comparativo[col]), normalizar_chave(quest[col])
+        dicionario = pd.Index(pd.concat([norm_c, norm_q]).dropna().unique())
+        ids_c[id_col] = dicionario.get_indexer(norm_c)  # -1 = chave vazia
+        ids_q[id_col] = dicionario.get_indexer(norm_q)
+        tamanhos[id_col] = len(dicionario)
+    # chave única do par: o multiplicador é o tamanho do dicionário de clientes (o maior id_cliente + 1)
+    n_clientes = tamanhos["id_cliente"]
+    def chave(ids):
+        par = ids["id_grupo"].astype("int64") * n_clientes + ids["id_cliente"]
+        return np.where((ids["id_grupo"] < 0) | (ids["id_cliente"] < 0), -1, par)
+    chave_c, chave_q = chave(ids_c), chave(ids_q)
+
+    relatorio = []
+    def anotar(tipo, df, mascara):
+        for (g, c), n in df.loc[mascara, ["Grupo", "Cliente"]].astype(object).value_counts(dropna=False, sort=False).items():
+            relatorio.append({"problema": tipo, "Grupo": g, "Cliente": c, "linhas": int(n)})
 
-        if not fin.empty:
-            fin = fin.copy(); fin.insert(0, "Grupo", grupo); fins.append(fin)
+    valida_q = chave_q >= 0
+    duplicada_q = pd.Series(chave_q).duplicated().to_numpy() & valida_q
+    anotar("duplicado no questionário (ignorado)", quest, duplicada_q)
+    anotar("duplicado no comparativo", comparativo, pd.Series(chave_c).duplicated(keep=False).to_numpy() & (chave_c >= 0))
+    anotar("questionário sem participante", quest, valida_q & ~duplicada_q & ~np.isin(chave_q, chave_c))
+    anotar("participante sem questionário", comparativo, ~np.isin(chave_c, chave_q[valida_q]))
+
+    respostas = [c for c in quest.columns if c not in ("Grupo", "Cliente") and c not in comparativo.columns]
+    unicas = quest.loc[valida_q & ~duplicada_q, respostas].set_axis(chave_q[valida_q & ~duplicada_q])
+    participantes = comparativo.reset_index(drop=True).copy()
+    for id_col in COLUNAS_ID:
+        participantes[id_col] = ids_c[id_col].astype("int32")
+    participantes = pd.concat([participantes, unicas.reindex(chave_c).reset_index(drop=True)], axis=1)
+    return participantes, pd.DataFrame(relatorio, columns=["problema", "Grupo", "Cliente", "linhas"])
+
+def preparar_abas(abas: dict[str, pd.DataFrame]) -> dict[str, pd.DataFrame]:
+    # abas tipadas e sem as linhas de total + participantes/relatório quando o master tem comparativo e questionário.
+    # Aba do ESQUEMAS que falta no master entra vazia (com as colunas); os problemas vão para ABA_AVISOS_ESQUEMA.
+    # Abas já preparadas passam de novo sem perder os avisos da 1ª passada
+    prontas = {}
+    avisos = abas[ABA_AVISOS_ESQUEMA].to_dict("records") if ABA_AVISOS_ESQUEMA in abas else []
+    for aba in ABAS_MASTER:
+        if aba not in abas:
+            avisos.append({"aba": aba, "problema": "aba ausente no master"})
+    for aba, df in {**{aba: pd.DataFrame() for aba in ABAS_MASTER}, **abas}.items():
+        if aba == ABA_AVISOS_ESQUEMA:
+            continue
+        prontas[aba], problemas = tipar_aba(df, aba)
+        if aba in ABAS_COM_TOTAL:
+            prontas[aba] = so_detalhe(prontas[aba], ABAS_COM_TOTAL[aba])
+        avisos += [{"aba": aba, "problema": problema} for problema in problemas if aba in abas]
+    prontas[ABA_AVISOS_ESQUEMA] = pd.DataFrame(avisos, columns=["aba", "problema"])
+    if ABA_PARTICIPANTES not in prontas and {"comparativo_master", "questionario"} <= prontas.keys():
+        prontas[ABA_PARTICIPANTES], prontas[ABA_RELATORIO_CHAVES] = montar_participantes(
+            prontas["comparativo_master"], prontas["questionario"])
+    return prontas
+
+# ====== CACHE COLUNAR: uma tabela Feather por aba, já tipada ======
+def caminho_sidecar(xlsx_path: Path) -> Path:
+    xlsx_path = Path(xlsx_path)
+    return xlsx_path.parent / (xlsx_path.stem + SIDECAR_SUFIXO)
+
+def compactar_inteiros(serie: pd.Series) -> pd.Series:
+    # int64 -> int16/int32 quando cabe com folga: a diferença entre duas colunas (ex.: Final - Inicial)
+    # continua sem estourar, e somas/médias do pandas já acumulam em 64 bits
+    if not pd.api.types.is_integer_dtype(serie.dtype) or serie.empty:
+        return serie
+    maior = int(serie.abs().max())
+    for tipo, limite in (("int16", 1 << 14), ("int32", 1 << 30)):
+        if maior < limite:
+            return serie.astype(tipo)
+    return serie
+
+def texto_resposta(valor):
+    # resposta como texto limpo; vazio/NaN ficam como ausente (nada de 'nan' literal)
+    if isinstance(valor, str):
+        valor = valor.strip()
+        return valor if valor else np.nan
+    return np.nan if pd.isna(valor) else str(valor)
+
+def tipar_aba(df: pd.DataFrame, aba: str) -> tuple[pd.DataFrame, list[str]]:
+    # esquema da aba (nomes, presença, vazios, tipos) + inteiros compactos; devolve (df, problemas)
+    df = df.copy()
+    df.columns = [str(c).strip() for c in df.columns]
+    df, problemas = normalizar_colunas(df, aba)
+    esquema = ESQUEMAS.get(aba, {})
+    for nome, spec in esquema.items():
+        if nome not in df.columns:
+            df[nome] = np.nan
+        if spec["preencher"]:
+            df[nome] = df[nome].fillna(df[spec["preencher"]])
+        if spec["padrao"] is not None:
+            df[nome] = df[nome].fillna(spec["padrao"])
+    categoricas = [nome for nome, spec in esquema.items() if spec["tipo"] in ("categoria", "nivel")]
+    textos = [nome for nome, spec in esquema.items() if spec["tipo"] == "texto"]
+    if aba in ABAS_RESPOSTAS:
+        for c in df.columns:
+            if not (df[c].dtype == object or pd.api.types.is_string_dtype(df[c].dtype)):
+                continue
+            df[c] = df[c].map(texto_resposta)
+            if c not in categoricas and c not in textos:
+                categoricas.append(c)
+    for c in textos:
+        # só os valores presentes viram texto: no pandas 2, astype(str) transformaria NaN em 'nan'
+        df[c] = df[c].astype(str).where(df[c].notna())
+    for c in categoricas:
+        if isinstance(df[c].dtype, pd.CategoricalDtype):
+            continue
+        if c in esquema and esquema[c]["tipo"] == "nivel":
+            extras = sorted(set(df[c].dropna().astype(str)) - set(NIVEIS_ORDER))
+            df[c] = pd.Categorical(df[c], categories=NIVEIS_ORDER + extras, ordered=True)
         else:
-            print(f"↪️ {p.name}: aba 'financeiro_resumo' ausente (pulando)")
+            df[c] = df[c].astype("category")
+    for c in df.columns:
+        df[c] = compactar_inteiros(df[c])
+    return df, problemas
 
-    if not comps and not nives and not fins:
-        print("❌ Nada para consolidar.")
-        return
+def data_atualizacao(xlsx_path: Path) -> datetime | None:
+    # carimbo 'modified' das propriedades do próprio xlsx (UTC): o openpyxl grava ao salvar pelo
+    # dados.py e o Excel ao salvar à mão; diferente do mtime, sobrevive a cópia/checkout do arquivo
+    try:
+        from openpyxl import load_workbook
+        wb = load_workbook(xlsx_path, read_only=True)
+        try:
+            return wb.properties.modified
+        finally:
+            wb.close()
+    except Exception:
+        return None
 
-    # ===== comparativo_master
-    comp_master = pd.concat(comps, ignore_index=True) if comps else pd.DataFrame()
-
-    # ===== niveis_master + TOTAL
-    if nives:
-        niv_master = pd.concat(nives, ignore_index=True)
-        for c in ["Nível", "Qtd Inicial", "Qtd Final"]:
-            if c not in niv_master.columns: niv_master[c] = 0
-        total_geral = (
-            niv_master.groupby("Nível", as_index=False)[["Qtd Inicial","Qtd Final"]]
-            .sum().assign(Grupo="TOTAL")
-        )
-        order = pd.CategoricalDtype(["Básico","Intermediário","Avançado"], ordered=True)
-        niv_master["Nível"] = niv_master["Nível"].astype(order)
-        niv_master = niv_master.sort_values(["Grupo","Nível"], na_position="last")
-        niv_master_full = pd.concat([niv_master, total_geral], ignore_index=True)
+def texto_atualizacao(xlsx_path: Path, fuso: str = "America/Sao_Paulo") -> str:
+    # data de atualização exibida (painel e relatórios), no fuso do painel; sem o carimbo, usa o mtime
+    import pytz
+    quando = data_atualizacao(xlsx_path)
+    if quando is not None:
+        quando = pytz.utc.localize(quando) if quando.tzinfo is None else quando
     else:
-        niv_master_full = pd.DataFrame(columns=["Grupo","Nível","Qtd Inicial","Qtd Final"])
-
-    # ===== financeiro_master + TOTAL
-    if fins:
-        fin_master = pd.concat(fins, ignore_index=True)
-        for c in ["Soma Inicial (todos)","Soma Final (todos)"]:
-            if c not in fin_master.columns: fin_master[c] = 0.0
-        soma_i = pd.to_numeric(fin_master["Soma Inicial (todos)"], errors="coerce").sum()
-        soma_f = pd.to_numeric(fin_master["Soma Final (todos)"], errors="coerce").sum()
-        total_row = {
-            "Grupo": "TOTAL",
-            "Bloco": "Gestão Financeira",
-            "Soma Inicial (todos)": soma_i,
-            "Soma Final (todos)": soma_f,
-            "Evolução Absoluta": soma_f - soma_i,
-            "% sobre Inicial": (soma_f - soma_i) / soma_i * 100.0 if soma_i else np.nan
+        quando = datetime.fromtimestamp(os.stat(xlsx_path).st_mtime, tz=pytz.utc)
+    return quando.astimezone(pytz.timezone(fuso)).strftime("%d/%m/%Y %H:%M:%S")
+
+def avisar_chaves(relatorio: pd.DataFrame, csv_path: Path):
+    # resumo no console + CSV legível (ao lado do cache) com cada chave sem par / duplicada
+    if relatorio.empty:
+        print("🔗 Participantes: todas as chaves Grupo/Cliente casaram, sem duplicadas.")
+        return
+    relatorio.to_csv(csv_path, index=False, encoding="utf-8-sig")
+    for problema, linhas in relatorio.groupby("problema", sort=False)["linhas"].sum().items():
+        print(f"🔗 Participantes: {linhas} linha(s) com {problema}")
+    print(f"   detalhes em: {csv_path}")
+
+def avisar_esquema(avisos: pd.DataFrame):
+    # o que o ESQUEMAS não encontrou no master (o painel também mostra, na barra lateral)
+    for linha in avisos.itertuples(index=False):
+        print(f"📐 Master, aba '{linha.aba}': {linha.problema}")
+
+def pasta_versao(xlsx_path: Path, versao: str) -> Path:
+    # pasta do cache colunar de uma versão dos dados (hash do xlsx) neste esquema de tipagem
+    return caminho_sidecar(xlsx_path) / f"v{VERSAO_ESQUEMA}-{versao}"
+
+def limpar_versoes(raiz: Path, manter: Path):
+    # apaga as outras versões (e o formato antigo, com os .feather soltos na raiz). Réplicas que ainda
+    # mapeiam uma versão velha seguem lendo (no Linux o arquivo só some quando o último mapa fecha);
+    # no Windows o arquivo mapeado não apaga: fica para a próxima limpeza
+    for item in raiz.iterdir():
+        if item == manter or item.name.startswith("."):  # .tmp = outra réplica gravando agora
+            continue
+        if item.is_dir():
+            shutil.rmtree(item, ignore_errors=True)
+        elif item.suffix == ".feather" or item.name == SIDECAR_META:
+            item.unlink(missing_ok=True)
+
+# ====== CACHE COLUNAR DE UMA ABA QUE CHEGA EM PARTES (o comparativo do main, um arquivo por vez) ======
+# Cada parte é tipada sozinha pelo tipar_aba. 1ª passada: junta os tipos e as categorias de todas as partes num
+# esquema só (o mesmo que a aba inteira teria); 2ª: grava lote a lote num Arrow IPC (o formato do Feather).
+# Depois os lotes viram um bloco só, coluna a coluna, para o ler_sidecar mapear sem cópia.
+# Na memória fica uma parte por vez e, no fim, uma coluna por vez
+def esquema_partes(partes: Iterator[pd.DataFrame], aba: str):
+    import pyarrow as pa
+    esquemas, primeiro, categorias = [], None, {}
+    for df in partes:
+        df, _ = tipar_aba(df, aba)
+        for c in df.columns:
+            if isinstance(df[c].dtype, pd.CategoricalDtype):
+                categorias.setdefault(c, {}).update(dict.fromkeys(df[c].cat.categories))
+        esquema = pa.Schema.from_pandas(df, preserve_index=False).remove_metadata()
+        primeiro = primeiro or esquema
+        # coluna vazia nesta parte (ou categoria, tipada depois) não decide o tipo da coluna
+        esquemas.append(pa.schema([pa.field(campo.name, pa.null()) if c in categorias or df[c].isna().all() else campo
+                                   for c, campo in zip(df.columns, esquema)]))
+    esquema = pa.unify_schemas(esquemas, promote_options="permissive")
+    # categorias como o tipar_aba daria à aba inteira: nível na ordem de NIVEIS_ORDER, as demais ordenadas
+    spec = ESQUEMAS.get(aba, {})
+    for c, valores in categorias.items():
+        if c in spec and spec[c]["tipo"] == "nivel":
+            categorias[c] = NIVEIS_ORDER + sorted(set(valores) - set(NIVEIS_ORDER))
+        else:
+            categorias[c] = sorted(valores)
+    campos = []
+    for campo in esquema:
+        if campo.name in categorias:
+            campo = pa.field(campo.name, pa.array(pd.Categorical([], categories=categorias[campo.name],
+                                                                 ordered=primeiro.field(campo.name).type.ordered)).type)
+        elif campo.type == pa.null():
+            campo = primeiro.field(campo.name)  # vazia em todas as partes: fica como na 1ª
+        campos.append(campo)
+    return pa.schema(campos), categorias
+
+def gravar_partes(destino: Path, aba: str, partes: Callable[[], Iterator[pd.DataFrame]]):
+    # 'partes' devolve as partes da aba (com as mesmas colunas) a cada chamada: são duas passadas
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    esquema, categorias = esquema_partes(partes(), aba)
+    lotes = destino.with_name(destino.name + ".lotes")
+    with pa.ipc.new_file(lotes, esquema) as escritor:
+        for df in partes():
+            df, _ = tipar_aba(df, aba)
+            for c, valores in categorias.items():
+                df[c] = df[c].cat.set_categories(valores)
+            escritor.write_table(pa.Table.from_pandas(df, preserve_index=False).replace_schema_metadata(None).cast(esquema))
+    # um bloco só: cada coluna é juntada sozinha e passa por um arquivo mapeado
+    colunas, temporarios = [], []
+    tabela = feather.read_table(lotes, memory_map=True)
+    for i, campo in enumerate(esquema):
+        temporarios.append(destino.with_name(f"{destino.name}.{i}"))
+        feather.write_feather(pa.table([tabela.column(i).combine_chunks()], schema=pa.schema([campo])), temporarios[-1],
+                              compression="uncompressed", chunksize=max(len(tabela), 1))
+        colunas.append(feather.read_table(temporarios[-1], memory_map=True).column(0))
+    feather.write_feather(pa.table(colunas, schema=esquema), destino, compression="uncompressed",
+                          chunksize=max(len(tabela), 1))
+    del tabela, colunas  # solta os mapas antes de apagar (no Windows, arquivo mapeado não apaga)
+    for caminho in [lotes, *temporarios]:
+        caminho.unlink(missing_ok=True)
+
+def gerar_sidecar(xlsx_path: Path, abas: dict[str, pd.DataFrame] | None = None, versao: str | None = None,
+                  comparativo_em_partes: Callable[[], Iterator[pd.DataFrame]] | None = None) -> bool:
+    # 'abas' = o que acabou de ser gravado no xlsx; sem isso, relê todas as abas do próprio xlsx.
+    # 'versao' = hash_arquivo(xlsx), quando quem chama já o tem (o painel tem: é a VERSAO_DADOS).
+    # 'comparativo_em_partes': o comparativo_master em partes (ver gravar_partes), no lugar de abas["comparativo_master"];
+    # os participantes saem das chaves dele + as colunas já gravadas (mapeadas), sem montar a aba inteira.
+    # Grava numa pasta temporária e publica com rename: quem lê nunca vê uma versão pela metade e, se duas
+    # réplicas gerarem a mesma versão ao mesmo tempo, a segunda descarta a sua. Feather sem compressão
+    # e em um bloco só por aba: é o formato que o ler_sidecar consegue mapear sem copiar.
+    xlsx_path = Path(xlsx_path)
+    raiz = caminho_sidecar(xlsx_path)
+    try:
+        import pyarrow  # noqa: F401  (to_feather depende dele)
+    except ImportError:
+        print("⚠️ Pacote 'pyarrow' não instalado: cache colunar não gerado.")
+        return False
+    if abas is None:
+        abas, versao = ler_xlsx(xlsx_path)
+    versao = versao or hash_arquivo(xlsx_path)
+    destino = pasta_versao(xlsx_path, versao)
+    temporaria = raiz / f".{destino.name}.{os.getpid()}.tmp"
+    try:
+        shutil.rmtree(temporaria, ignore_errors=True)
+        temporaria.mkdir(parents=True)
+        (raiz / f"{ABA_RELATORIO_CHAVES}.csv").unlink(missing_ok=True)
+        arquivos, comparativo = {}, None
+        if comparativo_em_partes is not None:
+            import pyarrow.feather as feather
+            gravar_partes(temporaria / "comparativo_master.feather", "comparativo_master", comparativo_em_partes)
+            arquivos["comparativo_master"] = "comparativo_master.feather"
+            comparativo = feather.read_table(temporaria / "comparativo_master.feather", memory_map=True)
+            # o preparar_abas só vê as colunas (avisos de esquema); a junção usa só as chaves
+            abas = {**abas, "comparativo_master": next(comparativo_em_partes()).head(0)}
+        prontas = preparar_abas(abas)
+        if comparativo is not None:
+            prontas[ABA_PARTICIPANTES], prontas[ABA_RELATORIO_CHAVES] = montar_participantes(
+                comparativo.select(["Grupo", "Cliente"]).to_pandas(), prontas["questionario"])
+        for aba, df in prontas.items():
+            if aba == ABA_RELATORIO_CHAVES:
+                avisar_chaves(df, raiz / f"{aba}.csv")
+            if aba == ABA_AVISOS_ESQUEMA:
+                avisar_esquema(df)
+            if aba in arquivos or (df.empty and len(df.columns) == 0):
+                continue
+            if aba == ABA_PARTICIPANTES and comparativo is not None:
+                # colunas do comparativo direto do arquivo mapeado + ids e respostas
+                import pyarrow as pa
+                extras = pa.Table.from_pandas(df[[c for c in df.columns if c not in comparativo.column_names]],
+                                              preserve_index=False)
+                tabela = comparativo
+                for campo, col in zip(extras.schema, extras.columns):
+                    tabela = tabela.append_column(campo, col)
+                feather.write_feather(tabela.replace_schema_metadata(None), temporaria / f"{aba}.feather",
+                                      compression="uncompressed", chunksize=max(len(tabela), 1))
+                del tabela
+            else:
+                df.reset_index(drop=True).to_feather(temporaria / f"{aba}.feather", compression="uncompressed",
+                                                     chunksize=max(len(df), 1))
+            arquivos[aba] = f"{aba}.feather"
+        del comparativo
+        meta = {
+            "origem": xlsx_path.name,
+            "versao": versao,
+            "esquema": VERSAO_ESQUEMA,
+            "gerado_em": datetime.now().isoformat(timespec="seconds"),
+            "abas": arquivos,
         }
-        fin_master_full = pd.concat([fin_master, pd.DataFrame([total_row])], ignore_index=True)
-    else:
-        fin_master_full = pd.DataFrame(columns=["Grupo","Bloco","Soma Inicial (todos)","Soma Final (todos)","Evolução Absoluta","% sobre Inicial"])
+        (temporaria / SIDECAR_META).write_text(json.dumps(meta, ensure_ascii=False, indent=1), encoding="utf-8")
+        try:
+            temporaria.rename(destino)
+        except OSError:
+            if not (destino / SIDECAR_META).exists():
+                raise
+            shutil.rmtree(temporaria, ignore_errors=True)  # outra réplica publicou esta versão antes
+    except Exception as e:
+        shutil.rmtree(temporaria, ignore_errors=True)
+        print(f"⚠️ Cache colunar não gerado ({e}); o painel vai ler o xlsx.")
+        return False
+    limpar_versoes(raiz, manter=destino)
+    print(f"🗂️ Cache colunar salvo em: {destino}")
+    return True
+
+def ler_xlsx(xlsx_path: Path) -> tuple[dict[str, pd.DataFrame], str]:
+    # todas as abas + a versão (hash) dos mesmos bytes que foram lidos: o arquivo vai uma vez só para a
+    # memória, e um xlsx trocado no meio da leitura não fica publicado sob a versão do anterior
+    conteudo = Path(xlsx_path).read_bytes()
+    return pd.read_excel(io.BytesIO(conteudo), sheet_name=None, engine="openpyxl"), hashlib.sha1(conteudo).hexdigest()
 
-    with pd.ExcelWriter(OUT_PATH, engine="openpyxl") as w:
-        if not comp_master.empty:      comp_master.to_excel(w, sheet_name="comparativo_master", index=False)
-        if not niv_master_full.empty:  niv_master_full.to_excel(w, sheet_name="niveis_master", index=False)
-        if not fin_master_full.empty:  fin_master_full.to_excel(w, sheet_name="financeiro_master", index=False)
+def ler_sidecar(xlsx_path: Path, versao: str | None = None, abas: list[str] | None = None) -> dict[str, pd.DataFrame] | None:
+    # abas do cache colunar da versão pedida (hash do xlsx; calculado aqui se não vier), ou None se essa
+    # versão ainda não foi gerada. 'abas' limita às que vão ser usadas (as outras nem são abertas).
+    # Os arquivos são mapeados (mmap): o SO divide as mesmas páginas entre todos os processos do host e as
+    # colunas de texto e as numéricas sem vazios viram DataFrame sem cópia (só-leitura; alterar = copy-on-write)
+    xlsx_path = Path(xlsx_path)
+    pasta = pasta_versao(xlsx_path, versao or hash_arquivo(xlsx_path))
+    try:
+        import pyarrow.feather as feather
+        meta = json.loads((pasta / SIDECAR_META).read_text(encoding="utf-8"))
+    except (ImportError, OSError, ValueError):
+        return None
+    nomes = {aba: nome for aba, nome in meta["abas"].items() if abas is None or aba in abas}
+    try:
+        return {aba: feather.read_table(pasta / nome, memory_map=True).to_pandas(split_blocks=True)
+                for aba, nome in nomes.items()}
+    except Exception:
+        shutil.rmtree(pasta, ignore_errors=True)  # versão estragada: some, e a próxima carga a refaz
+        return None
 
-    print(f"✅ Consolidado salvo em: {OUT_PATH}")
+def abas_do_painel(xlsx_path: Path, versao: str | None = None) -> dict[str, pd.DataFrame]:
+    # ABAS_PAINEL + avisos de esquema, como o painel (e o exportar_relatorios.py) usam: do cache colunar da
+    # versão, mapeado; sem ele, lê o xlsx (todas as abas de uma vez) e grava o cache para as próximas cargas
+    abas = ler_sidecar(xlsx_path, versao, ABAS_PAINEL + [ABA_AVISOS_ESQUEMA])
+    if abas is None:
+        # o cache sai com a versão do que foi lido, que pode já não ser 'versao' (arquivo trocado nesse meio
+        # tempo): o Recarregador nota a troca e passa para a versão nova, que então já tem o cache
+        abas, lida = ler_xlsx(xlsx_path)
+        abas = preparar_abas(abas)
+        gerar_sidecar(xlsx_path, abas, lida)
+    return abas
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Consolida os '*resultado*.xlsx' em master_resultados.xlsx")
+    parser.add_argument("--incremental", action="store_true",
+                        help=f"relê só os arquivos novos/alterados (manifesto e cache em <raiz>/{CACHE_DIRNAME})")
+    parser.add_argument("--raiz", type=Path, default=None, help=f"pasta com os resultados (padrão: {ROOT_DIR})")
+    parser.add_argument("--workers", type=int, default=1, metavar="N",
+                        help="processos para ler as planilhas em paralelo (padrão: 1, sequencial)")
+    parser.add_argument("--incluir", action="append", metavar="PADRAO",
+                        help=f"padrão de nome dos arquivos de entrada, pode repetir (padrão: {' '.join(PADROES_INCLUIR)})")
+    parser.add_argument("--excluir", action="append", metavar="PADRAO",
+                        help="padrão de nome de arquivo/pasta a ignorar, pode repetir (além de ~$*.xlsx e dos caches)")
+    parser.add_argument("--podar-dias", type=float, default=None, metavar="N",
+                        help="pastas já listadas e sem alteração há N dias não são relidas (nem o que há dentro delas)")
+    parser.add_argument("--sidecar", type=Path, default=None, metavar="XLSX",
+                        help="só (re)gera o cache colunar de um master já existente e sai")
+    args = parser.parse_args()
+    if args.sidecar is not None:
+        gerar_sidecar(args.sidecar)
+        raise SystemExit(0)
+    main(incremental=args.incremental, raiz=args.raiz, workers=args.workers,
+         incluir=args.incluir, excluir=args.excluir, podar_dias=args.podar_dias)
@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+# Relatórios estáticos por cooperativa, sem navegador nem Streamlit: os mesmos cartões de KPI e gráficos
+# do painel (Visão Geral, canceladas, comparativo, perfil), com a cooperativa selecionada.
+#  • sempre: <saida>/<cooperativa>/relatorio.html (abre offline; o plotly.js vai uma vez só, na <saida>)
+#    + <saida>/index.html com o link de todos;
+#  • com o pacote 'kaleido' instalado: cada gráfico também em PNG (ou PDF/SVG, --formato) na mesma pasta.
+# Números e figuras saem das mesmas funções do painel (agregacoes.py / graficos.py), sobre o cache colunar
+# do master: cada processo mapeia as tabelas e monta o índice e os cubos do perfil uma vez só, e cada
+# relatório é só somar as parciais da cooperativa e desenhar.
+#   python exportar_relatorios.py --workers 8
+#   python exportar_relatorios.py --cooperativas AGROPAN COTRIPAL --formato pdf
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+import argparse
+import html
+import importlib.util
+import os
+import re
+import time
+
+import dados
+import graficos
+from agregacoes import (PERGUNTAS_PERFIL, PERGUNTAS_POR_NIVEL, agregar_adesao, agregar_comparativo, calcular_kpis,
+                        construir_cubo_perfil, construir_indice, contagem_respostas, fatiar, niveis_por_resposta,
+                        resumo_respostas, somar_cubo, somar_niveis)
+
+EXCEL_PATH = Path("master_resultados.xlsx")  # o mesmo do painel
+SAIDA_PADRAO = Path("relatorios")
+GERAL = "Todas"  # relatório com todas as cooperativas (o "Todas" da sidebar)
+# opções dos seletores do painel que entram no relatório (o painel mostra uma por vez)
+OPCOES_PONTUACAO = ["Pontuação Final", "Evolução Detalhada (Inicial vs. Final)"]
+OPCOES_ADESAO = ["Pontuação Final (Acumulado)", "Evolução Detalhada (Inicial vs. Final)"]
+FORMATOS_IMAGEM = ["png", "pdf", "svg"]
+TAMANHO_IMAGEM = {"width": 1200, "height": 600}
+
+# ====== UM CONTEXTO POR PROCESSO (tabelas mapeadas + agregados prontos) ======
+_contexto = {}
+
+def preparar_contexto(xlsx_path: Path, versao: str):
+    # roda uma vez em cada processo (inicializador do pool): o cache colunar já existe (o processo
+    # principal garante), então as tabelas são mapeadas do disco e divididas entre os processos
+    abas = dados.abas_do_painel(xlsx_path, versao)
+    tabelas = [abas[aba] for aba in dados.ABAS_PAINEL]
+    comparativo = tabelas[0]
+    _contexto.update(
+        canceladas=tabelas[4],
+        financeiro=tabelas[2],
+        indice=construir_indice(*tabelas),
+        cubos=construir_cubo_perfil(comparativo, PERGUNTAS_PERFIL),
+        atualizacao=dados.texto_atualizacao(xlsx_path),
+        versao=versao,
+    )
+
+# ====== CONTEÚDO DE UM RELATÓRIO ======
+def nome_arquivo(texto: str) -> str:
+    return re.sub(r"[^\w.-]+", "_", texto).strip("_") or "sem_nome"
+
+def montar_relatorio(grupo: str) -> tuple[dict, list[tuple[str, str, object]]]:
+    # (KPIs, [(seção, nome do gráfico, figura)]) do que o painel mostra com 'grupo' selecionado (GERAL = todas)
+    indice = _contexto["indice"]
+    grupos = None if grupo == GERAL else frozenset([grupo])
+    figuras = []
+
+    niveis = somar_niveis(indice["niveis"], grupos, rotulo="TOTAL" if grupos is None else "Seleção")
+    if not niveis.empty:
+        figuras.append(("Visão Geral", "niveis", graficos.fig_niveis(niveis, grupo)))
+
+    canceladas = _contexto["canceladas"]
+    if grupos is not None:
+        canceladas = fatiar(canceladas, indice["canceladas"], grupos)
+    if not canceladas.empty:
+        etapas = graficos.fig_canceladas_etapas(canceladas, dados.COLUNAS_ENCONTROS)
+        if etapas is not None:
+            figuras.append(("Detalhe Canceladas", "canceladas_etapas", etapas))
+        figuras.append(("Detalhe Canceladas", "canceladas_ranking", graficos.fig_ranking_canceladas(canceladas)))
+
+    pontuacao, medias = agregar_comparativo(indice["comparativo_parciais"], grupos)
+    if not pontuacao.empty:
+        for opcao in OPCOES_PONTUACAO:
+            figuras.append(("Análise Comparativa por Grupo", f"pontuacao_{nome_arquivo(opcao)}",
+                            graficos.fig_pontuacao(pontuacao, opcao, medias.get(opcao))))
+    financeiro = _contexto["financeiro"]
+    if grupos is not None:
+        financeiro = fatiar(financeiro, indice["financeiro"], grupos)
+    adesao = agregar_adesao(financeiro, indice["comparativo_parciais"]["Participantes"])
+    if not adesao.empty:
+        for opcao in OPCOES_ADESAO:
+            figuras.append(("Análise Comparativa por Grupo", f"adesao_{nome_arquivo(opcao)}",
+                            graficos.fig_adesao(adesao, opcao)))
+
+    for n, (pergunta, cubo) in enumerate(_contexto["cubos"].items(), start=1):
+        soma = somar_cubo(cubo, grupos)
+        if pergunta in PERGUNTAS_POR_NIVEL:
+            contagem = contagem_respostas(soma, com_nivel=True)
+            if not contagem.empty:
+                figuras.append(("Análise por Perfil", f"perfil{n}_pizza", graficos.fig_perfil_pizza(contagem)))
+                figuras.append(("Análise por Perfil", f"perfil{n}_niveis", graficos.fig_perfil_niveis(
+                    niveis_por_resposta(soma, pergunta, dados.NIVEIS_ORDER), pergunta)))
+        else:
+            contagem = contagem_respostas(soma)
+            if not contagem.empty:
+                figuras.append(("Análise por Perfil", f"perfil{n}_respostas",
+                                graficos.fig_perfil_respostas(resumo_respostas(contagem), pergunta)))
+    return calcular_kpis(indice, grupos), figuras
+
+# ====== SAÍDA: HTML (SEMPRE) E IMAGENS (COM KALEIDO) ======
+CSS_RELATORIO = """
+    body {font-family: sans-serif; margin: 24px 40px; color: #252525;}
+    h1, h2 {color: #084074;}
+    .cartoes {display: grid; grid-template-columns: repeat(auto-fit, minmax(180px, 1fr)); gap: 14px; margin: 12px 0 20px;}
+"""
+
+def html_relatorio(grupo: str, kpis: dict, figuras: list) -> str:
+    titulo = html.escape(f"Relatório — {grupo}")
+    partes = [f"<h1>{titulo}</h1>",
+              f"<p>Dados atualizados em {_contexto['atualizacao']} (versão {_contexto['versao'][:12]})</p>",
+              '<div class="cartoes">' + "".join(graficos.cartoes_topo(kpis)) + "</div>"]
+    secao_atual = None
+    for secao, nome, fig in figuras:
+        if secao != secao_atual:
+            partes.append(f"<h2>{html.escape(secao)}</h2>")
+            if secao == "Visão Geral":
+                partes.append('<div class="cartoes">' + "".join(graficos.cartoes_visao_geral(kpis)) + "</div>")
+            secao_atual = secao
+        partes.append(fig.to_html(full_html=False, include_plotlyjs=False, div_id=nome))
+    return (f'<!DOCTYPE html>\n<html lang="pt-BR"><head><meta charset="utf-8"><title>{titulo}</title>\n'
+            f'<script src="../plotly.min.js"></script>\n<style>{graficos.CSS_CARTOES}{CSS_RELATORIO}</style></head>\n'
+            "<body>\n" + "\n".join(partes) + "\n</body></html>\n")
+
+def gravar_imagens(figuras: list, pasta: Path, formato: str) -> int:
+    import plotly.io as pio
+    caminhos = [pasta / f"{nome}.{formato}" for _, nome, _ in figuras]
+    figs = [fig for _, _, fig in figuras]
+    if hasattr(pio, "write_images"):
+        # plotly >= 6.1: uma sessão do kaleido (Chrome) para todas as figuras do relatório
+        pio.write_images(figs, caminhos, format=formato, **TAMANHO_IMAGEM)
+    else:
+        for fig, caminho in zip(figs, caminhos):
+            fig.write_image(caminho, format=formato, **TAMANHO_IMAGEM)
+    return len(caminhos)
+
+def exportar_grupo(grupo: str, saida: Path, formato: str | None) -> dict:
+    # um relatório inteiro (roda num processo do pool); devolve o resumo para o console
+    t0 = time.perf_counter()
+    kpis, figuras = montar_relatorio(grupo)
+    pasta = saida / nome_arquivo(grupo)
+    pasta.mkdir(parents=True, exist_ok=True)
+    (pasta / "relatorio.html").write_text(html_relatorio(grupo, kpis, figuras), encoding="utf-8")
+    imagens, erro = 0, None
+    if formato:
+        try:
+            imagens = gravar_imagens(figuras, pasta, formato)
+        except Exception as e:  # Chrome ausente para o kaleido, etc.: o HTML já está gravado
+            erro = str(e)
+    return {"grupo": grupo, "pasta": pasta.name, "figuras": len(figuras), "imagens": imagens, "erro": erro,
+            "segundos": time.perf_counter() - t0}
+
+def gravar_indice(saida: Path, resultados: list[dict]):
+    itens = "\n".join(f'<li><a href="{r["pasta"]}/relatorio.html">{html.escape(r["grupo"])}</a></li>' for r in resultados)
+    (saida / "index.html").write_text(
+        '<!DOCTYPE html>\n<html lang="pt-BR"><head><meta charset="utf-8"><title>Relatórios</title>\n'
+        f"<style>{CSS_RELATORIO}</style></head>\n<body>\n<h1>Relatórios por cooperativa</h1>\n<ul>\n{itens}\n</ul>\n</body></html>\n",
+        encoding="utf-8")
+
+def exportar(xlsx_path: Path = EXCEL_PATH, saida: Path = SAIDA_PADRAO, grupos: list[str] | None = None,
+             workers: int = 1, formato: str | None = "png") -> list[dict]:
+    # grupos=None -> o geral + todas as cooperativas do master. formato=None (ou sem kaleido) -> só HTML
+    xlsx_path, saida = Path(xlsx_path).resolve(), Path(saida)
+    if formato and importlib.util.find_spec("kaleido") is None:
+        print("⚠️ Pacote 'kaleido' não instalado: só os relatórios em HTML (pip install kaleido para PNG/PDF).")
+        formato = None
+    versao = dados.hash_arquivo(xlsx_path)
+    preparar_contexto(xlsx_path, versao)  # também gera o cache colunar, se ainda não existir
+    conhecidos = [GERAL] + _contexto["indice"]["grupos"]
+    for grupo in set(grupos or []) - set(conhecidos):
+        print(f"⚠️ Cooperativa '{grupo}' não está no master (pulando)")
+    grupos = [g for g in grupos if g in conhecidos] if grupos else conhecidos
+    if not grupos:
+        raise SystemExit("❌ Nenhuma das cooperativas pedidas está no master: nada para exportar.")
+    saida.mkdir(parents=True, exist_ok=True)
+    from plotly.offline import get_plotlyjs
+    (saida / "plotly.min.js").write_text(get_plotlyjs(), encoding="utf-8")
+
+    tarefa = partial(exportar_grupo, saida=saida, formato=formato)
+    if workers <= 1 or len(grupos) <= 1:
+        resultados = list(map(tarefa, grupos))
+    else:
+        workers = min(workers, len(grupos))
+        with ProcessPoolExecutor(max_workers=workers, initializer=preparar_contexto, initargs=(xlsx_path, versao)) as pool:
+            resultados = list(pool.map(tarefa, grupos, chunksize=max(1, len(grupos) // (workers * 4))))
+    gravar_indice(saida, resultados)
+    return resultados
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exporta os relatórios do painel (KPIs + gráficos) por cooperativa")
+    parser.add_argument("--xlsx", type=Path, default=EXCEL_PATH, help=f"master (padrão: {EXCEL_PATH})")
+    parser.add_argument("--saida", type=Path, default=SAIDA_PADRAO, help=f"pasta dos relatórios (padrão: {SAIDA_PADRAO})")
+    parser.add_argument("--cooperativas", nargs="+", metavar="NOME",
+                        help=f"só estas (use '{GERAL}' para o relatório geral); padrão: o geral + todas")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, metavar="N",
+                        help="processos exportando em paralelo (padrão: um por CPU)")
+    parser.add_argument("--formato", choices=FORMATOS_IMAGEM, default="png", help="imagem de cada gráfico (precisa do kaleido)")
+    parser.add_argument("--so-html", action="store_true", help="não gera imagens, só os HTML")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    resultados = exportar(args.xlsx, args.saida, args.cooperativas, args.workers, None if args.so_html else args.formato)
+    for r in resultados:
+        if r["erro"]:
+            print(f"⚠️ {r['grupo']}: imagens não geradas ({r['erro']}); o HTML foi gravado")
+    figuras = sum(r["figuras"] for r in resultados)
+    imagens = sum(r["imagens"] for r in resultados)
+    print(f"📄 {len(resultados)} relatório(s), {figuras} gráfico(s), {imagens} imagem(ns) em {args.saida.resolve()}")
+    tempo = f"⏱️ {time.perf_counter() - t0:.1f}s ({args.workers} processo(s))"
+    if resultados:
+        lento = max(resultados, key=lambda r: r["segundos"])
+        tempo += f"; mais lento: {lento['grupo']} ({lento['segundos']:.2f}s)"
+    print(tempo)
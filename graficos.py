@@ -0,0 +1,395 @@
+# -*- coding: utf-8 -*-
+# Construtores dos gráficos do painel: funções puras (DataFrame -> go.Figure), sem Streamlit.
+# O painel guarda as figuras prontas em cache por (versão dos dados, seleção, opção do gráfico).
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pandas as pd
+
+from dados import NIVEIS_ORDER
+
+# plotly é importado dentro de cada construtor: o painel sobe (e serve a 1ª tela) sem pagar o import dele
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
+
+# ================== CORES (AZUL CLARO/ESCURO) ==================
+cores_principais = ['#084074', '#6AA4D9', '#F2E77F', '#252525']
+mapa_cores_sim_nao = {'Sim': '#084074', 'Não': '#6AA4D9'}
+
+mapa_cores_evolucao = {
+    'Pontuação Inicial': '#6AA4D9', # Azul Mais Claro
+    'Pontuação Final': '#084074',   # Azul Escuro
+    'Qtd Inicial': '#6AA4D9',
+    'Qtd Final': '#084074',
+    'Soma Inicial': '#6AA4D9',
+    'Soma Final': '#084074'
+}
+
+cor_grafico_principal = '#084074'
+
+# --------- FUNÇÕES DE ESTILO PLOTLY ---------
+def add_plotly_border(fig: go.Figure, color="#333", width=2, pad=0.004):
+    x0, y0 = 0 + pad, 0 + pad
+    x1, y1 = 1 - pad, 1 - pad
+    fig.add_shape(
+        type="rect",
+        xref="paper", yref="paper",
+        x0=x0, y0=y0, x1=x1, y1=y1,
+        line=dict(color=color, width=width),
+        layer="above"
+    )
+    return fig
+
+def style_fig(fig: go.Figure, border_color="#333", border_width=2, pad=0.004) -> go.Figure:
+    fig.update_layout(
+        margin=dict(l=48, r=48, t=64, b=48),
+        paper_bgcolor="white",
+        plot_bgcolor="white",
+        bargap=0.15,
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    add_plotly_border(fig, border_color, border_width, pad)
+    return fig
+
+# --------- "HALTERES" (INICIAL x FINAL POR COOPERATIVA) ---------
+def fig_halteres(chart_data: pd.DataFrame, col_inicial: str, col_final: str, nomes: tuple[str, str], formato: str) -> go.Figure:
+    # Sempre 3 traces, qualquer que seja o nº de cooperativas: os segmentos cinza vão num único
+    # trace de linha (pares inicial/final separados por None) + os dois traces de marcadores.
+    # Os rótulos saem do texttemplate, sem formatar texto linha a linha em Python.
+    import plotly.graph_objects as go
+    n = len(chart_data)
+    grupos = chart_data["Grupo"].astype(object).to_numpy()
+    x_seg = np.full(n * 3, np.nan)
+    x_seg[0::3] = chart_data[col_inicial].to_numpy(dtype=float)
+    x_seg[1::3] = chart_data[col_final].to_numpy(dtype=float)
+    y_seg = np.empty(n * 3, dtype=object)
+    y_seg[0::3] = grupos
+    y_seg[1::3] = grupos
+
+    fig = go.Figure()
+
+    fig.add_trace(go.Scatter(
+        x=x_seg,
+        y=y_seg,
+        mode='lines',
+        line=dict(color="gray", width=1),
+        hoverinfo='skip',
+        showlegend=False
+    ))
+
+    for col, nome, lado, cor, tamanho, rotulo in [
+        (col_inicial, nomes[0], 'middle left', '#6AA4D9', 10, 'Inicial'),
+        (col_final, nomes[1], 'middle right', '#084074', 14, 'Final'),
+    ]:
+        fig.add_trace(go.Scatter(
+            x=chart_data[col],
+            y=grupos,
+            mode='markers+text',
+            texttemplate=f'%{{x{formato}}}',
+            textposition=lado,
+            textfont=dict(color='black', weight='bold'),
+            name=nome,
+            marker=dict(color=cor, size=tamanho),
+            customdata=chart_data["Participantes"],
+            hovertemplate=f'<b>%{{y}}</b><br>{rotulo}: %{{x{formato}}}<br>Participantes: %{{customdata}}<extra></extra>'
+        ))
+
+    return fig
+
+# ================== VISÃO GERAL ==================
+def fig_niveis(niveis_df: pd.DataFrame, texto_selecao: str) -> go.Figure:
+    import plotly.express as px
+    niveis_df = niveis_df.copy()
+    niveis_df["Nível"] = pd.Categorical(
+        niveis_df["Nível"], categories=NIVEIS_ORDER, ordered=True
+    )
+    niveis_chart_df = niveis_df.melt(
+        id_vars=["Grupo", "Nível"],
+        value_vars=["Qtd Inicial", "Qtd Final"],
+        var_name="Tipo",
+        value_name="Quantidade"
+    )
+    fig = px.bar(
+        niveis_chart_df,
+        x="Nível",
+        y="Quantidade",
+        color="Tipo",
+        text="Quantidade",
+        barmode="group",
+        title=f"Distribuição de Níveis - {texto_selecao}",
+        labels={"Quantidade": "Nr. Participantes"},
+        color_discrete_map=mapa_cores_evolucao,
+        category_orders={"Nível": NIVEIS_ORDER}
+    )
+    fig.update_traces(
+        texttemplate='%{text:.0f}',
+        textposition='auto'
+    )
+    fig.update_yaxes(showgrid=False)
+    fig.update_xaxes(tickfont=dict(weight='bold'))
+    fig.update_layout(
+        height=500,
+        title_font_size=20
+    )
+    return style_fig(fig)
+
+# ================== CANCELADAS ==================
+def fig_canceladas_etapas(plot_df: pd.DataFrame, colunas_encontros: list[str]) -> go.Figure | None:
+    # None quando não há nenhuma etapa com quantidade > 0
+    import plotly.express as px
+    melted_df = plot_df.melt(id_vars="COOPERATIVA", value_vars=colunas_encontros, var_name="Etapa", value_name="Quantidade")
+    melted_df = melted_df[melted_df["Quantidade"] > 0]
+    if melted_df.empty:
+        return None
+
+    plot_df = plot_df.sort_values(by="TOTAL", ascending=True, kind="stable")
+
+    fig = px.bar(
+        melted_df,
+        x="Quantidade",
+        y="COOPERATIVA",
+        color="Etapa",
+        orientation='h',
+        barmode='stack',
+        title="Consultorias Canceladas por Etapa Concluída",
+        category_orders={"COOPERATIVA": plot_df["COOPERATIVA"].tolist()},
+        text="Quantidade"
+    )
+
+    # Texto deitado (0 graus) e centralizado
+    fig.update_traces(
+        textposition='inside',
+        textfont=dict(weight='bold'),
+        texttemplate='%{text:.0f}',
+        textangle=0,
+        insidetextanchor='middle'
+    )
+
+    fig.update_xaxes(showgrid=False)
+    return style_fig(fig)
+
+def fig_ranking_canceladas(plot_df: pd.DataFrame) -> go.Figure:
+    import plotly.express as px
+    ranked_canceladas_df = plot_df.sort_values(by="TOTAL", ascending=True, kind="stable")
+    fig = px.bar(
+        ranked_canceladas_df[ranked_canceladas_df["TOTAL"] > 0],
+        x="TOTAL",
+        y="COOPERATIVA",
+        orientation='h',
+        text="TOTAL",
+        title="Total de Cancelamentos por Cooperativa",
+        color_discrete_sequence=[cor_grafico_principal]
+    )
+    fig.update_traces(
+        textposition='outside',
+        textfont=dict(weight='bold')
+    )
+    fig.update_xaxes(showgrid=False)
+    fig.update_yaxes(title=None)
+    return style_fig(fig)
+
+# ================== COMPARATIVO: CONHECIMENTO ==================
+def fig_pontuacao(pontuacao_df: pd.DataFrame, escolha: str, media_geral: float | None = None) -> go.Figure:
+    import plotly.express as px
+    if escolha == "Ambas":
+        melt = pontuacao_df.sort_values(by="Pontuação Final", ascending=True).melt(
+            id_vars=["Grupo", "Participantes"],
+            value_vars=["Pontuação Inicial", "Pontuação Final"],
+            var_name="Tipo",
+            value_name="Valor"
+        )
+
+        fig = px.bar(
+            melt,
+            x="Valor",
+            y="Grupo",
+            color="Tipo",
+            orientation='h',
+            barmode="group",
+            color_discrete_map=mapa_cores_evolucao,
+            title="Conhecimento: Inicial vs. Final",
+            labels={'Valor': "Média da Pontuação", "Grupo": "Cooperativa"},
+            text_auto='.2f',
+            hover_data=["Participantes"]
+        )
+        fig.update_xaxes(showgrid=False)
+
+    elif escolha == "Evolução Detalhada (Inicial vs. Final)":
+        chart_data = pontuacao_df.sort_values(by="Pontuação Final", ascending=True)
+
+        fig = fig_halteres(
+            chart_data, "Pontuação Inicial", "Pontuação Final",
+            nomes=('Nota Inicial', 'Nota Final'), formato=':.2f'
+        )
+
+        fig.update_layout(
+            title="Pontuação Inicial vs. Final (Detalhado)",
+            xaxis_title="Média de Pontuação",
+            yaxis_title="Cooperativa",
+            height=600,
+            margin=dict(l=0, r=0, t=40, b=0),
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+            font=dict(color="black")
+        )
+
+        fig.update_xaxes(showgrid=False, tickfont=dict(color='black', weight='bold'))
+        fig.update_yaxes(showgrid=False, tickfont=dict(color='black', weight='bold'))
+
+    else:
+        dados_plot = pontuacao_df.sort_values(by=escolha, ascending=True)
+        fig = px.bar(
+            dados_plot,
+            x=escolha,
+            y="Grupo",
+            orientation='h',
+            title=f"Ranking de {escolha} (Conhecimento)",
+            labels={escolha: "Pontuação", "Grupo": "Cooperativa"},
+            text_auto='.2f',
+            color_discrete_sequence=[cor_grafico_principal],
+            hover_data=["Participantes"]
+        )
+
+        fig.add_vline(x=media_geral, line_width=2, line_dash="dash", line_color="#F2E77F", annotation_text=f"Média: {media_geral:.1f}")
+        fig.update_xaxes(showgrid=False)
+
+    return style_fig(fig)
+
+# ================== COMPARATIVO: ADESÃO À TRILHA ==================
+def fig_adesao(adesao_df: pd.DataFrame, escolha_adesao: str) -> go.Figure:
+    import plotly.express as px
+    if escolha_adesao == 'Pontuação Final (Acumulado)':
+        dados_plot = adesao_df.sort_values(by="Soma Final", ascending=True)
+        fig = px.bar(
+            dados_plot,
+            x="Soma Final",
+            y="Grupo",
+            orientation='h',
+            title="Panorama de Adesão Final (Pontuação Acumulada)",
+            labels={"Soma Final": "Pontos de Adesão", "Grupo": "Cooperativa"},
+            text="Soma Final",
+            color_discrete_sequence=[cor_grafico_principal],
+            hover_data=["Participantes"]
+        )
+        fig.update_traces(
+            textposition='inside',
+            textfont=dict(weight='bold'),
+            texttemplate='%{text:.0f}',
+            textangle=0,
+            insidetextanchor='middle'
+        )
+        fig.update_xaxes(showgrid=False)
+
+    elif escolha_adesao == 'Evolução (Ganho)':
+        dados_plot = adesao_df.sort_values(by="Ganho de Adesão", ascending=True)
+        fig = px.bar(
+            dados_plot,
+            x="Ganho de Adesão",
+            y="Grupo",
+            orientation='h',
+            title="Evolução (Pontos Ganhos durante a Consultoria)",
+            labels={"Ganho de Adesão": "Novos Pontos Conquistados", "Grupo": "Cooperativa"},
+            text="Ganho de Adesão",
+            color_discrete_sequence=[cor_grafico_principal],
+            hover_data=["Participantes"]
+        )
+
+        fig.update_traces(
+            textposition='inside',
+            textfont=dict(weight='bold'),
+            texttemplate='%{text:.0f}',
+            textangle=0,
+            insidetextanchor='middle'
+        )
+
+        media_esforco = adesao_df["Ganho de Adesão"].mean()
+        fig.add_vline(x=media_esforco, line_width=2, line_dash="dash", line_color="#F2E77F", annotation_text=f"Média: {media_esforco:.0f}")
+
+        fig.update_xaxes(showgrid=False)
+
+    else:  # 'Evolução Detalhada (Inicial vs. Final)'
+        chart_data = adesao_df.sort_values(by="Soma Final", ascending=True)
+
+        fig = fig_halteres(
+            chart_data, "Soma Inicial", "Soma Final",
+            nomes=('Adesão Inicial', 'Adesão Final'), formato=':.0f'
+        )
+
+        fig.update_layout(
+            title="Pontuação Inicial vs. Final",
+            xaxis_title="Pontos de Adesão",
+            yaxis_title="Cooperativa",
+            height=600,
+            margin=dict(l=0, r=0, t=40, b=0),
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+            font=dict(color="black")
+        )
+
+        # Remove a grade e garante fonte preta, SEM borda manual extra
+        fig.update_xaxes(showgrid=False, tickfont=dict(color='black', weight='bold'))
+        fig.update_yaxes(showgrid=False, tickfont=dict(color='black', weight='bold'))
+
+    # A borda vem apenas da função style_fig
+    return style_fig(fig)
+
+# ================== PERFIL ==================
+def fig_perfil_pizza(contagem_respostas: pd.Series) -> go.Figure:
+    import plotly.express as px
+    fig = px.pie(values=contagem_respostas.values, names=contagem_respostas.index, title="Distribuição das Respostas", hole=.3, color_discrete_sequence=cores_principais)
+    fig.update_traces(textinfo='percent+label', textfont_size=14)
+    return style_fig(fig)
+
+def fig_perfil_niveis(niveis_por_resposta: pd.DataFrame, pergunta: str) -> go.Figure:
+    import plotly.express as px
+    fig = px.bar(niveis_por_resposta, x='Nível Final', y='Contagem', color=pergunta, barmode='group', title="Distribuição do Nível Final por Resposta", labels={'Contagem': 'Nr. de Produtores', 'Nível Final': 'Nível Final'}, category_orders={"Nível Final": NIVEIS_ORDER}, color_discrete_map=mapa_cores_sim_nao)
+    fig.update_traces(texttemplate='%{y}', textposition='outside')
+    fig.update_yaxes(showgrid=False)
+    return style_fig(fig)
+
+def fig_perfil_respostas(summary_df: pd.DataFrame, pergunta: str) -> go.Figure:
+    import plotly.express as px
+    fig = px.bar(summary_df, x='Contagem', y='Resposta', orientation='h', title=f'Distribuição de Respostas para: "{pergunta}"', text=summary_df['Porcentagem'].apply(lambda p: f'{p:.1f}%'))
+    fig.update_traces(textposition='outside', marker_color=cores_principais[0])
+    fig.update_layout(yaxis_title="Respostas", xaxis_title="Número de Respostas")
+    fig.update_xaxes(showgrid=False)
+    return style_fig(fig)
+
+# ================== CARTÕES DE KPI (HTML: painel e exportar_relatorios.py) ==================
+CSS_CARTOES = """
+    .card {
+        background:#f1f5fa;
+        border-radius:13px;
+        padding:16px 28px 8px 28px;
+        box-shadow:0 2px 4px 0 rgba(120,120,140,0.13);
+        border:2px solid #dee5ed;
+        text-align: center; 
+    }
+    
+    .kpi-label {color:#366093;font-size:16.5px;font-weight:400;}
+    .kpi-value {color:#084074;font-size:29px;font-weight:700;margin-top:4px;}
+    .kpi-value-cancel {color:#e85b41;}
+    .kpi-value-pend {color:#e0972c;}
+"""
+
+def cartao_kpi(rotulo: str, valor, classe: str = "") -> str:
+    classes = f"kpi-value {classe}" if classe else "kpi-value"
+    return f'<div class="card"><div class="kpi-label">{rotulo}</div><div class="{classes}">{valor}</div></div>'
+
+def cartoes_topo(kpis: dict) -> list[str]:
+    # os 5 cartões do topo do painel (agregacoes.calcular_kpis)
+    return [
+        cartao_kpi("Cooperativas", kpis["cooperativas"]),
+        cartao_kpi("Total de clientes", kpis["clientes"]),
+        cartao_kpi("Atend. finalizados", kpis["finalizados"]),
+        cartao_kpi("Consultorias canceladas", int(kpis["cancelados"]), "kpi-value-cancel"),
+        cartao_kpi("Conclusão dos atendimentos", f"{kpis['conclusao']:.1f}%", "kpi-value-pend"),
+    ]
+
+def cartoes_visao_geral(kpis: dict) -> list[str]:
+    # os 3 cartões da Visão Geral: total de produtores = atendimentos finalizados (o mesmo do topo)
+    return [
+        cartao_kpi("Total de produtores", kpis["finalizados"]),
+        cartao_kpi("Pontuação Média Inicial", f"{kpis['media_inicial']:.2f}"),
+        cartao_kpi("Pontuação Média Final", f"{kpis['media_final']:.2f}"),
+    ]
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+# Tempos por etapa de cada rerun do painel e das fases do dados.py (sem depender do Streamlit).
+# Cria-se um Medidor por rerun/execução, as etapas ficam em `with medidor.etapa("nome"):`
+# (podem ser aninhadas: "aba Visão Geral" > "figura niveis") e no fim mostra/exporta o resumo.
+#  • PAINEL_TEMPOS=1          -> painel de depuração na sidebar com as etapas deste rerun
+#  • PAINEL_TEMPOS_DIR=pasta  -> uma linha JSON por rerun em pasta/<sessão>.jsonl
+#  • PAINEL_PERFIL=cprofile|pyinstrument -> perfila o rerun inteiro (funções mais caras no resumo)
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+import io
+import json
+import os
+import sys
+import time
+
+MOSTRAR_TEMPOS = os.environ.get("PAINEL_TEMPOS", "0") == "1"
+PASTA_TEMPOS = os.environ.get("PAINEL_TEMPOS_DIR", "")
+PERFIL = os.environ.get("PAINEL_PERFIL", "").strip().lower()
+LINHAS_PERFIL = 25
+
+def pico_memoria_mb(filhos: bool = False) -> float | None:
+    # pico de RSS do processo (ou do maior processo filho já encerrado, p.ex. os workers do dados.py);
+    # 'resource' não existe no Windows: lá usa o psutil, se instalado. None quando não dá para medir
+    try:
+        import resource
+    except ImportError:
+        if filhos:
+            return None
+        try:
+            import psutil
+        except ImportError:
+            return None
+        info = psutil.Process().memory_info()
+        return round(getattr(info, "peak_wset", info.rss) / 2**20, 1)
+    pico = resource.getrusage(resource.RUSAGE_CHILDREN if filhos else resource.RUSAGE_SELF).ru_maxrss
+    return round(pico / 2**20 if sys.platform == "darwin" else pico / 1024, 1)  # macOS: bytes; Linux: KiB
+
+class Medidor:
+    def __init__(self, sessao: str, perfil: str = PERFIL, memoria: bool = False):
+        self.sessao = sessao
+        self.inicio = time.perf_counter()
+        self.momento = datetime.now().isoformat(timespec="seconds")
+        self.etapas = []       # {"nome", "nivel", "ms"[, "pico_mb"]} na ordem em que começaram
+        self.contexto = {}     # informações soltas do rerun (seleção, aba aberta...)
+        self.memoria = memoria  # anota o pico de RSS ao fim de cada etapa (ele só cresce: mostra quem o empurrou)
+        self._nivel = 0
+        self._perfilador = None
+        self.perfil = perfil
+        if perfil:
+            self._iniciar_perfil(perfil)
+
+    @contextmanager
+    def etapa(self, nome: str):
+        # o tempo entra mesmo se a etapa levantar exceção (inclusive o st.stop() do Streamlit)
+        posicao = len(self.etapas)
+        self.etapas.append(None)  # reserva a posição: a etapa externa aparece antes das internas
+        self._nivel += 1
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._nivel -= 1
+            item = {"nome": nome, "nivel": self._nivel, "ms": round((time.perf_counter() - inicio) * 1000, 1)}
+            if self.memoria:
+                item["pico_mb"] = pico_memoria_mb()
+            self.etapas[posicao] = item
+
+    # --------- PERFIL (OPCIONAL) ---------
+    def _iniciar_perfil(self, perfil: str):
+        if perfil == "pyinstrument":
+            try:
+                from pyinstrument import Profiler
+            except ImportError:
+                print("⚠️ pyinstrument não instalado; usando cProfile")
+                perfil = "cprofile"
+            else:
+                self._perfilador = Profiler()
+                self._perfilador.start()
+                return
+        if perfil != "cprofile":
+            print(f"⚠️ PAINEL_PERFIL='{perfil}' desconhecido (use cprofile ou pyinstrument)")
+            self.perfil = ""
+            return
+        import cProfile
+        self.perfil = perfil
+        self._perfilador = cProfile.Profile()
+        try:
+            self._perfilador.enable()
+        except ValueError:
+            # Python 3.12+: só um cProfile ativo por processo (outra sessão já está perfilando)
+            self._perfilador = None
+
+    def _parar_perfil(self) -> str:
+        if self._perfilador is None:
+            return ""
+        if self.perfil == "pyinstrument":
+            self._perfilador.stop()
+            texto = self._perfilador.output_text(unicode=True, color=False)
+        else:
+            import pstats
+            self._perfilador.disable()
+            saida = io.StringIO()
+            pstats.Stats(self._perfilador, stream=saida).sort_stats("cumulative").print_stats(LINHAS_PERFIL)
+            texto = saida.getvalue()
+        self._perfilador = None
+        return texto
+
+    # --------- RESUMO / EXPORTAÇÃO ---------
+    def finalizar(self) -> dict:
+        # fecha o rerun: para o perfilador e devolve o resumo (uma linha do JSONL)
+        resumo = {
+            "sessao": self.sessao,
+            "momento": self.momento,
+            "total_ms": round((time.perf_counter() - self.inicio) * 1000, 1),
+            "etapas": [item for item in self.etapas if item is not None],
+            "contexto": self.contexto,
+            "perfil": self._parar_perfil(),
+        }
+        if self.memoria:
+            resumo["pico_mb"] = pico_memoria_mb()
+            resumo["pico_filhos_mb"] = pico_memoria_mb(filhos=True)
+        return resumo
+
+def exportar_jsonl(resumo: dict, pasta: str = PASTA_TEMPOS) -> Path | None:
+    # acrescenta o rerun ao arquivo da sessão (um arquivo por sessão, uma linha por rerun)
+    if not pasta:
+        return None
+    destino = Path(pasta) / f"{resumo['sessao']}.jsonl"
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    with destino.open("a", encoding="utf-8") as f:
+        f.write(json.dumps(resumo, ensure_ascii=False, default=str) + "\n")
+    return destino
@@ -1,36 +1,35 @@
 # app_unificado.py
 # -*- coding: utf-8 -*-
+import importlib.util
 import os
-import numpy as np
-import pandas as pd
+import uuid
 import streamlit as st
-from datetime import datetime
-
-# Plotly
-try:
-    import plotly.express as px
-    import plotly.graph_objects as go
-except ImportError:
+from streamlit.errors import StreamlitAPIException
+
+from agregacoes import (PERGUNTAS_PERFIL, PERGUNTAS_POR_NIVEL, agregar_adesao, agregar_comparativo, calcular_kpis,
+                        construir_cubo_perfil, construir_indice, contagem_respostas, exportar_csv, exportar_parquet,
+                        fatia_pagina, fatiar, niveis_por_resposta, ordem_linhas, resumo_respostas, selecionar_linhas,
+                        somar_cubo, somar_niveis, texto_busca)
+from dados import ABA_AVISOS_ESQUEMA, ABAS_PAINEL, COLUNAS_ENCONTROS, COLUNAS_ID, NIVEIS_ORDER, abas_do_painel, texto_atualizacao
+from instrumentacao import MOSTRAR_TEMPOS, Medidor, exportar_jsonl
+from recarga import recarregador
+
+# Tempos por etapa deste rerun (PAINEL_TEMPOS=1 mostra na sidebar; PAINEL_TEMPOS_DIR grava JSONL por sessão;
+# PAINEL_PERFIL=cprofile|pyinstrument perfila o rerun inteiro). Ver instrumentacao.py
+medidor = Medidor(sessao=st.session_state.setdefault("sessao_tempos", uuid.uuid4().hex[:12]))
+
+# Plotly (os gráficos são montados em graficos.py, que só importa o plotly no 1º gráfico):
+# aqui só confere que o pacote existe, sem carregá-lo
+import graficos
+if importlib.util.find_spec("plotly") is None:
     st.error("Pacote 'plotly' não está instalado. Rode: pip install plotly")
     st.stop()
 
 # --------- CSS VISUAL ---------
 st.set_page_config(layout="wide")
+# (cartões de KPI: graficos.CSS_CARTOES, o mesmo dos relatórios exportados)
 st.markdown("""
-    <style>
-    .card {
-        background:#f1f5fa;
-        border-radius:13px;
-        padding:16px 28px 8px 28px;
-        box-shadow:0 2px 4px 0 rgba(120,120,140,0.13);
-        border:2px solid #dee5ed;
-        text-align: center; 
-    }
-    
-    .kpi-label {color:#366093;font-size:16.5px;font-weight:400;}
-    .kpi-value {color:#084074;font-size:29px;font-weight:700;margin-top:4px;}
-    .kpi-value-cancel {color:#e85b41;}
-    .kpi-value-pend {color:#e0972c;}
+    <style>""" + graficos.CSS_CARTOES + """
     .section-box {background:#f3f5fa;border-radius:14px;border:1.5px solid #d4dae6;padding:24px 14px 18px 22px;margin-bottom:26px;}
     .js-plotly-plot, .js-plotly-plot .plot-container, .js-plotly-plot .main-svg {
         overflow: visible !important;
@@ -44,136 +43,190 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
-# ================== CORES (AZUL CLARO/ESCURO) ==================
-cores_principais = ['#084074', '#6AA4D9', '#F2E77F', '#252525']
-mapa_cores_sim_nao = {'Sim': '#084074', 'Não': '#6AA4D9'}
-
-mapa_cores_evolucao = {
-    'Pontuação Inicial': '#6AA4D9', # Azul Mais Claro
-    'Pontuação Final': '#084074',   # Azul Escuro
-    'Qtd Inicial': '#6AA4D9',       
-    'Qtd Final': '#084074',         
-    'Soma Inicial': '#6AA4D9',      
-    'Soma Final': '#084074'         
-}
-
-NIVEIS_ORDER = ["Básico", "Intermediário", "Avançado"]
-cor_grafico_principal = '#084074'
-
 # ==============================================================================
-# -------------------- ⚠️ DATA DE ATUALIZAÇÃO MANUAL ⚠️ --------------------
+# -------------------- FONTE DOS DADOS / VERSÃO ----------------------------
 # ==============================================================================
-# ALTERE AQUI A DATA E HORA PARA ATUALIZAR O PAINEL:
-DATA_MANUAL = "17/11/2025 21:00:00" 
+# A versão dos dados é o hash do conteúdo do xlsx: trocou o arquivo, o painel monta a versão nova
+# em segundo plano (recarga.py) e passa a usá-la quando estiver pronta, sem ninguém esperar a carga;
+# a data exibida vem do próprio xlsx (não precisa editar código).
+EXCEL_PATH = "master_resultados.xlsx"
 # ==============================================================================
 
 
-# --------- FUNÇÕES DE ESTILO PLOTLY ---------
-def add_plotly_border(fig: go.Figure, color="#333", width=2, pad=0.004):
-    x0, y0 = 0 + pad, 0 + pad
-    x1, y1 = 1 - pad, 1 - pad
-    fig.add_shape(
-        type="rect",
-        xref="paper", yref="paper",
-        x0=x0, y0=y0, x1=x1, y1=y1,
-        line=dict(color=color, width=width),
-        layer="above"
-    )
-    return fig
-
-def style_fig(fig: go.Figure, border_color="#333", border_width=2, pad=0.004) -> go.Figure:
-    fig.update_layout(
-        margin=dict(l=48, r=48, t=64, b=48),
-        paper_bgcolor="white",
-        plot_bgcolor="white",
-        bargap=0.15,
-        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
-    )
-    add_plotly_border(fig, border_color, border_width, pad)
-    return fig
-
-# --------- CARREGAMENTO DE DADOS (CACHE BASEADO NA DATA MANUAL) ---------
-@st.cache_data
-def load_all_data(data_versao): 
-    # O parâmetro 'data_versao' serve para forçar a recarga quando a DATA_MANUAL muda
-    excel_file_path = "master_resultados.xlsx"
-    
-    comparativo_df = pd.read_excel(excel_file_path, sheet_name="comparativo_master")
-    niveis_df = pd.read_excel(excel_file_path, sheet_name="niveis_master")
-    financeiro_df = pd.read_excel(excel_file_path, sheet_name="financeiro_master")
-    questionario_df = pd.read_excel(excel_file_path, sheet_name="questionario")
-    status_df = pd.read_excel(excel_file_path, sheet_name="status_consultorias")
-
+# --------- CACHE DAS FIGURAS ---------
+@st.cache_resource(show_spinner=False, max_entries=512)
+def figura_em_cache(nome, data_versao, grupos, opcao, _construir):
+    # Figuras prontas (go.Figure) compartilhadas entre sessões, por (gráfico, versão, seleção, opção):
+    # voltar a uma aba/opção já vista reaproveita a figura em vez de refazer px + style_fig.
+    # '_construir' (sem hash) só roda na primeira vez; as figuras não são alteradas depois de prontas.
+    return _construir()
+
+def figura(nome, data_versao, grupos, opcao, _construir):
+    with medidor.etapa(f"figura {nome}"):
+        return figura_em_cache(nome, data_versao, grupos, opcao, _construir)
+
+def desenhar(nome, fig, **kwargs):
+    # st.plotly_chart serializa a figura para o navegador: medido à parte da montagem
+    with medidor.etapa(f"enviar {nome}"):
+        st.plotly_chart(fig, **kwargs)
+
+# --------- CARREGAMENTO DE DADOS (UM PACOTE POR VERSÃO DOS DADOS) ---------
+# Nada aqui chama o Streamlit: o pacote de uma versão nova é montado pela thread do Recarregador
+def load_all_data(data_versao, avisos, excel_file_path=EXCEL_PATH): 
+    # as tabelas são as mesmas para todas as sessões (sem cópia por rerun); só são lidas
+    # (fatias e cópias rasas são copy-on-write no pandas)
+
+    # Prefere o cache colunar desta versão (master_resultados_colunar/, gerado pelo dados.py), mapeado do
+    # disco e dividido com as outras réplicas do host; se ainda não existir, lê o xlsx (todas as abas de
+    # uma vez) e grava o cache para as próximas
+    abas = abas_do_painel(excel_file_path, data_versao)
+
+    # abas já no esquema do dados.py (nomes, tipos e colunas garantidos; aba ausente vem vazia) e
+    # comparativo + respostas do questionário já casados (e sem duplicadas) pelo dados.preparar_abas
+    for linha in abas[ABA_AVISOS_ESQUEMA].itertuples(index=False):
+        avisos.append(f"Aba '{linha.aba}': {linha.problema}.")
+
+    # participantes, níveis, financeiro, status, canceladas
+    return tuple(abas[aba] for aba in ABAS_PAINEL)
+
+def montar_pacote(data_versao):
+    # tudo o que um rerun precisa de uma versão dos dados: tabelas, índice dos filtros (posições das
+    # linhas + subtotais de níveis por cooperativa), data de atualização e avisos da carga
+    avisos = []
+    tabelas = load_all_data(data_versao, avisos)
+    return {"tabelas": tabelas, "indice": construir_indice(*tabelas), "atualizacao": texto_atualizacao(EXCEL_PATH), "avisos": avisos}
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def agregados_comparativo(data_versao, grupos, _indice, _financeiro_df):
+    # chave: (versão dos dados, frozenset dos grupos | None = todos); trocar só o radio não recalcula nada.
+    # Limitado como o das figuras: cada seleção nova da sidebar é uma entrada
+    pontuacao_df, medias = agregar_comparativo(_indice["comparativo_parciais"], grupos)
+    financeiro_sel = _financeiro_df if grupos is None else fatiar(_financeiro_df, _indice["financeiro"], grupos)
+    adesao_df = agregar_adesao(financeiro_sel, _indice["comparativo_parciais"]["Participantes"])
+    return pontuacao_df, adesao_df, medias
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def cubos_perfil(data_versao, perguntas, _comparativo_df):
+    # contagens Grupo × (resposta, Nível Final) de cada pergunta do perfil, uma vez por versão dos dados
+    # (só quando a aba de perfil é aberta); trocar a pergunta ou a seleção é só somar linhas.
+    # Só a versão publicada e a anterior (sessões que ainda não viram a troca do Recarregador)
+    return construir_cubo_perfil(_comparativo_df, perguntas)
+
+# --------- TABELAS DE DETALHE (SÓ A PÁGINA VISÍVEL VAI PARA O NAVEGADOR) ---------
+TAMANHOS_PAGINA = [25, 50, 100, 200]
+SEM_ORDEM = "(ordem original)"
+
+@st.cache_resource(show_spinner=False, max_entries=64)
+def indice_tabela(nome, data_versao, grupos, _df):
+    # texto de busca + ordenações já feitas da tabela, por (tabela, versão dos dados, seleção da sidebar)
+    return {"texto": texto_busca(_df), "ordens": {}}
+
+def tabela_paginada(df, nome, data_versao, grupos):
+    # busca, ordenação e paginação no servidor; o st.dataframe recebe só as linhas/colunas da página
+    indice = indice_tabela(nome, data_versao, grupos, df)
+    todas_colunas = [c for c in df.columns if c not in COLUNAS_ID]  # ids internos não vão para a tela
+
+    c_busca, c_ordem, c_sentido = st.columns([3, 2, 1])
+    busca = c_busca.text_input("Buscar", key=f"{nome}_busca", placeholder="Trecho em qualquer coluna de texto")
+    coluna_ordem = c_ordem.selectbox("Ordenar por", [SEM_ORDEM] + todas_colunas, key=f"{nome}_ordem")
+    decrescente = c_sentido.toggle("Decrescente", key=f"{nome}_decrescente")
+    colunas = st.multiselect("Colunas", todas_colunas, default=todas_colunas, key=f"{nome}_colunas") or todas_colunas
+
+    chave_ordem = (None if coluna_ordem == SEM_ORDEM else coluna_ordem, decrescente)
+    if chave_ordem not in indice["ordens"]:
+        indice["ordens"][chave_ordem] = ordem_linhas(df, *chave_ordem)
+    posicoes = selecionar_linhas(indice["ordens"][chave_ordem], indice["texto"], busca)
+
+    c_tamanho, c_pagina, c_info = st.columns([1, 1, 3])
+    tamanho = c_tamanho.selectbox("Linhas por página", TAMANHOS_PAGINA, index=1, key=f"{nome}_tamanho")
+    n_paginas = max(1, -(-len(posicoes) // tamanho))
+    if st.session_state.get(f"{nome}_pagina", 1) > n_paginas:
+        st.session_state[f"{nome}_pagina"] = n_paginas  # busca/tamanho novos podem encolher a tabela
+    pagina = c_pagina.number_input(f"Página (de {n_paginas})", min_value=1, max_value=n_paginas, step=1, key=f"{nome}_pagina")
+    na_pagina = fatia_pagina(posicoes, int(pagina), tamanho)
+    inicio = (int(pagina) - 1) * tamanho
+    c_info.caption(f"Linhas {inicio + 1 if len(na_pagina) else 0}–{inicio + len(na_pagina)} de {len(posicoes)} "
+                   f"(total sem busca: {len(df)})")
+    st.dataframe(df.iloc[na_pagina][colunas])
+
+    # exportação do filtro atual inteiro (busca + ordem + colunas)
+    c_csv, c_parquet = st.columns(2)
+    with c_csv:
+        botao_download("⬇️ CSV (filtro atual)", lambda: exportar_csv(df, posicoes, colunas), f"{nome}.csv", "text/csv")
+    with c_parquet:
+        botao_download("⬇️ Parquet (filtro atual)", lambda: exportar_parquet(df, posicoes, colunas),
+                       f"{nome}.parquet", "application/octet-stream")
+
+def botao_download(rotulo, gerar, arquivo, mime):
+    # o arquivo só é gerado no clique; Streamlit sem data "preguiçoso" (callable) recebe os bytes prontos
     try:
-        canceladas_df = pd.read_excel(excel_file_path, sheet_name="canceladas_detalhe")
-    except Exception as e:
-        st.sidebar.error("Aba 'canceladas_detalhe' não encontrada no Excel.")
-        canceladas_df = pd.DataFrame(columns=["COOPERATIVA"])
-
-    for df in [comparativo_df, niveis_df, financeiro_df, questionario_df, status_df, canceladas_df]:
-        df.columns = df.columns.str.strip()
+        st.download_button(rotulo, data=gerar, file_name=arquivo, mime=mime)
+    except StreamlitAPIException:
+        st.download_button(rotulo, data=gerar(), file_name=arquivo, mime=mime)
 
-    for col in questionario_df.select_dtypes(include=['object']).columns:
-      questionario_df[col] = questionario_df[col].astype(str).str.strip()
+# ================== CARREGAMENTO PRINCIPAL ==================
+with medidor.etapa("carregar dados"):
+    # versão publicada (a anterior continua valendo enquanto a nova é montada em segundo plano)
+    # (o spinner só aparece se demorar: na prática, na 1ª carga do processo)
+    dados_painel = recarregador(EXCEL_PATH, montar_pacote)  # um por processo, dividido entre as sessões
+    with st.spinner("Carregando os dados..."):
+        VERSAO_DADOS, pacote = dados_painel.obter()
+    comparativo_df, niveis_df, financeiro_df, status_df, canceladas_df = pacote["tabelas"]
+    indice = pacote["indice"]
+for aviso in pacote["avisos"]:
+    st.sidebar.error(aviso)
+if dados_painel.carregando:
+    st.sidebar.caption("🔄 Nova versão dos dados sendo carregada; esta tela muda para ela quando estiver pronta.")
 
-    questionario_df.rename(columns={'COOPERATIVA': 'Grupo', 'CLIENTE': 'Cliente'}, inplace=True)
-    merged_df = pd.merge(comparativo_df, questionario_df, on=['Grupo', 'Cliente'], how='left')
+# ================== SIDEBAR E FILTROS ==================
+with medidor.etapa("sidebar e filtros"):
+    st.sidebar.title("Filtros")
 
-    return merged_df, niveis_df, financeiro_df, status_df, canceladas_df
+    grupos_disponiveis = indice["grupos"]
+    opcoes_filtro = ["Todas"] + grupos_disponiveis
 
-# ================== CARREGAMENTO PRINCIPAL ==================
-comparativo_df, niveis_df, financeiro_df, status_df, canceladas_df = load_all_data(data_versao=DATA_MANUAL)
+    selecao_grupos = st.sidebar.multiselect(
+        "Selecione uma ou mais cooperativas:",
+        options=opcoes_filtro,
+        default=["Todas"]
+    )
 
-# ================== SIDEBAR E FILTROS ==================
-st.sidebar.title("Filtros")
-
-grupos_disponiveis = sorted(comparativo_df["Grupo"].dropna().unique().tolist())
-opcoes_filtro = ["Todas"] + grupos_disponiveis
-
-selecao_grupos = st.sidebar.multiselect(
-    "Selecione uma ou mais cooperativas:",
-    options=opcoes_filtro,
-    default=["Todas"]
-)
-
-if not selecao_grupos:
-    st.sidebar.warning("Selecione pelo menos uma cooperativa.")
-    comparativo_filtrado_df = comparativo_df.iloc[0:0]
-    niveis_filtrado_df = niveis_df.iloc[0:0]
-    financeiro_filtrado_df = financeiro_df.iloc[0:0]
-    status_filtrado_df = status_df.iloc[0:0]
-    canceladas_filtrado_df = canceladas_df.iloc[0:0]
-    texto_selecao = "Nenhuma"
-
-elif "Todas" in selecao_grupos or len(selecao_grupos) == len(grupos_disponiveis):
-    comparativo_filtrado_df = comparativo_df.copy()
-    niveis_filtrado_df = niveis_df[niveis_df["Grupo"] == "TOTAL"].copy()
-    financeiro_filtrado_df = financeiro_df.copy()
-    status_filtrado_df = status_df.copy()
-    canceladas_filtrado_df = canceladas_df.copy()
-    texto_selecao = "Todas"
+    if not selecao_grupos:
+        st.sidebar.warning("Selecione pelo menos uma cooperativa.")
+        grupos_chave = frozenset()
+        comparativo_filtrado_df = comparativo_df.iloc[0:0]
+        niveis_filtrado_df = niveis_df.iloc[0:0]
+        canceladas_filtrado_df = canceladas_df.iloc[0:0]
+        texto_selecao = "Nenhuma"
+
+    elif "Todas" in selecao_grupos or len(selecao_grupos) == len(grupos_disponiveis):
+        grupos_chave = None
+        # cópias rasas: as tabelas em cache (mapeadas do disco) não são duplicadas a cada rerun
+        comparativo_filtrado_df = comparativo_df.copy(deep=False)
+        niveis_filtrado_df = somar_niveis(indice["niveis"], rotulo="TOTAL")
+        canceladas_filtrado_df = canceladas_df.copy(deep=False)
+        texto_selecao = "Todas"
 
-else:
-    grupos_para_filtrar = selecao_grupos
+    else:
+        grupos_para_filtrar = selecao_grupos
+        grupos_chave = frozenset(grupos_para_filtrar)
     
-    comparativo_filtrado_df = comparativo_df[comparativo_df["Grupo"].isin(grupos_para_filtrar)].copy()
-    financeiro_filtrado_df = financeiro_df[financeiro_df["Grupo"].isin(grupos_para_filtrar)].copy()
-    status_filtrado_df = status_df[status_df["COOPERATIVA"].isin(grupos_para_filtrar)].copy()
+        # Fatia pelas posições pré-indexadas de cada cooperativa (sem varrer as tabelas a cada clique)
+        comparativo_filtrado_df = fatiar(comparativo_df, indice["comparativo"], grupos_para_filtrar)
     
-    # Filtra canceladas pela coluna COOPERATIVA
-    canceladas_filtrado_df = canceladas_df[canceladas_df["COOPERATIVA"].isin(grupos_para_filtrar)].copy()
+        # Filtra canceladas pela coluna COOPERATIVA
+        canceladas_filtrado_df = fatiar(canceladas_df, indice["canceladas"], grupos_para_filtrar)
 
-    niveis_partial_df = niveis_df[niveis_df["Grupo"].isin(grupos_para_filtrar)].copy()
-    niveis_filtrado_df = niveis_partial_df.groupby("Nível")[["Qtd Inicial", "Qtd Final"]].sum().reset_index()
-    niveis_filtrado_df["Grupo"] = "Seleção" 
+        # Níveis: soma dos subtotais já calculados por cooperativa
+        niveis_filtrado_df = somar_niveis(indice["niveis"], grupos_para_filtrar)
     
-    if len(grupos_para_filtrar) > 3:
-        texto_selecao = f"{len(grupos_para_filtrar)} cooperativas"
-    else:
-        texto_selecao = ", ".join(grupos_para_filtrar)
+        if len(grupos_para_filtrar) > 3:
+            texto_selecao = f"{len(grupos_para_filtrar)} cooperativas"
+        else:
+            texto_selecao = ", ".join(grupos_para_filtrar)
 
 
-# --------- DATA DE ATUALIZAÇÃO (MANUAL) E LOGO ---------
+# --------- DATA DE ATUALIZAÇÃO (DO XLSX) E LOGO ---------
 
 _, col_right = st.columns([3, 1]) 
 
@@ -184,7 +237,7 @@ with col_right:
         st.markdown(
             f"""
             <div style='text-align: right;'>
-                <span style='font-size: 16px; font-weight: bold; color: #084074;'>{DATA_MANUAL}</span>
+                <span style='font-size: 16px; font-weight: bold; color: #084074;'>{pacote['atualizacao']}</span>
                 <br>
                 <span style='font-size: 13px; color: #366093;'>Data de Atualização</span>
             </div>
@@ -201,528 +254,205 @@ with col_right:
 
 # --------- KPIs (ORIGEM DOS DADOS CORRIGIDA) ---------
 
-# 1. Total de Cooperativas
-total_grupos_visiveis = comparativo_filtrado_df["Grupo"].nunique()
+with medidor.etapa("KPIs"):
+    # cooperativas, clientes (aba status, para bater com o Excel), finalizados, canceladas (só as linhas de
+    # detalhe: o total geral do Excel não entra no cache), % de conclusão e médias, das somas por cooperativa
+    kpis = calcular_kpis(indice, grupos_chave)
+    for coluna_kpi, cartao in zip(st.columns(5), graficos.cartoes_topo(kpis)):
+        with coluna_kpi: st.markdown(cartao, unsafe_allow_html=True)
 
-# 2. Total de Clientes (Vem direto da aba STATUS para bater com o Excel)
-if not status_filtrado_df.empty:
-    total_clientes_reais = status_filtrado_df["Quantidade de clientes"].sum()
-else:
-    total_clientes_reais = 0
-
-# 3. Finalizados (Usa o Total de Clientes da aba status como base para ser coerente, 
-#    ou comparativo_df se preferir contar os dados brutos. 
-#    Para bater 431 com 431, usaremos o dado de status ou contagem do comparativo se forem iguais).
-#    No seu caso, ambos são 431.
-total_ativos_reais = total_clientes_reais 
-
-# 4. Canceladas (CORREÇÃO DE SOMA DUPLA: Remove linha de total e soma apenas os dados reais)
-if not canceladas_filtrado_df.empty and "TOTAL" in canceladas_filtrado_df.columns:
-    # Filtra para não somar a linha que tem 'COOPERATIVA' vazia (que é a linha de total geral do Excel)
-    clean_canceladas = canceladas_filtrado_df.dropna(subset=['COOPERATIVA'])
-    # Se ainda tiver uma linha escrita 'TOTAL', remove também
-    clean_canceladas = clean_canceladas[clean_canceladas.iloc[:, 0].astype(str).str.upper() != 'TOTAL']
-    
-    total_cancelados_reais = pd.to_numeric(clean_canceladas["TOTAL"], errors='coerce').sum()
+# ---------- ABAS ----------
+NOMES_ABAS = ["Visão Geral", "Detalhe Canceladas", "Análise Comparativa por Grupo", "Análise por Perfil", "Dados Detalhados"]
+# Abas "preguiçosas": a cada clique só a aba visível é calculada e enviada ao navegador.
+# PAINEL_ABAS_LAZY=0 volta ao modo antigo (todas as abas em todo rerun), para comparar os tempos.
+ABAS_LAZY = os.environ.get("PAINEL_ABAS_LAZY", "1") != "0"
+
+# Widgets que ficam dentro das abas perdem o valor nos reruns em que a aba não é desenhada;
+# regravar a chave no session_state mantém a escolha do usuário ao voltar para a aba.
+for chave in ("pontuacao_radio", "adesao_radio", "pergunta_perfil"):
+    if chave in st.session_state:
+        st.session_state[chave] = st.session_state[chave]
+
+if ABAS_LAZY:
+    try:
+        abas = st.tabs(NOMES_ABAS, key="aba_ativa", on_change="rerun")
+        abas_abertas = [bool(aba.open) for aba in abas]
+    except TypeError:
+        # Streamlit sem abas com estado (on_change/.open): seletor horizontal no lugar das abas
+        aba_escolhida = st.radio("Aba:", NOMES_ABAS, horizontal=True, key="aba_ativa", label_visibility="collapsed")
+        abas = [st.container() for _ in NOMES_ABAS]
+        abas_abertas = [nome == aba_escolhida for nome in NOMES_ABAS]
 else:
-    total_cancelados_reais = 0
-
-# 5. Percentual (Considerando 431 como total esperado e realizado)
-percentual_conclusao = (100 * total_ativos_reais / total_clientes_reais) if total_clientes_reais > 0 else 0
-
+    abas = st.tabs(NOMES_ABAS)
+    abas_abertas = [True] * len(NOMES_ABAS)
 
-k1, k2, k3, k4, k5 = st.columns(5)
-with k1: st.markdown(f'<div class="card"><div class="kpi-label">Cooperativas</div><div class="kpi-value">{total_grupos_visiveis}</div></div>', unsafe_allow_html=True)
-with k2: st.markdown(f'<div class="card"><div class="kpi-label">Total de clientes</div><div class="kpi-value">{total_clientes_reais}</div></div>', unsafe_allow_html=True)
-with k3: st.markdown(f'<div class="card"><div class="kpi-label">Atend. finalizados</div><div class="kpi-value">{total_ativos_reais}</div></div>', unsafe_allow_html=True)
-with k4: st.markdown(f'<div class="card"><div class="kpi-label">Consultorias canceladas</div><div class="kpi-value kpi-value-cancel">{int(total_cancelados_reais)}</div></div>', unsafe_allow_html=True)
-with k5: st.markdown(f'<div class="card"><div class="kpi-label">Conclusão dos atendimentos</div><div class="kpi-value kpi-value-pend">{percentual_conclusao:.1f}%</div></div>', unsafe_allow_html=True)
-
-# ---------- ABAS ----------
-tab_geral, tab_canceladas, tab_comparativo, tab_perfil, tab_detalhes = st.tabs(
-    ["Visão Geral", "Detalhe Canceladas", "Análise Comparativa por Grupo", "Análise por Perfil", "Dados Detalhados"]
-)
+tab_geral, tab_canceladas, tab_comparativo, tab_perfil, tab_detalhes = abas
+aba_aberta = dict(zip(NOMES_ABAS, abas_abertas))
+medidor.contexto.update(selecao=texto_selecao, abas=[nome for nome in NOMES_ABAS if aba_aberta[nome]])
 
 # ==============================================================
 # ---------------- TAB 1 - VISÃO GERAL -------------------------
 # ==============================================================
 
-with tab_geral:
+with tab_geral, medidor.etapa("aba Visão Geral"):
+    if aba_aberta["Visão Geral"]:
 
-    st.header("Análise Geral")
-    st.subheader(f"Cooperativa selecionada: {texto_selecao}") 
-    
-    col1, col2, col3 = st.columns(3)
-    media_inicial = comparativo_filtrado_df["Pontuação Inicial"].mean()
-    media_final   = comparativo_filtrado_df["Pontuação Final"].mean()
+        st.header("Análise Geral")
+        st.subheader(f"Cooperativa selecionada: {texto_selecao}") 
     
-    # Sincroniza o 'Total de produtores' com o KPI principal se for 'Todas', senão conta o filtro
-    total_produtores = total_ativos_reais
-
-    with col1: 
-        st.markdown(f'<div class="card"><div class="kpi-label">Total de produtores</div><div class="kpi-value">{total_produtores}</div></div>', unsafe_allow_html=True)
-    with col2: 
-        st.markdown(f'<div class="card"><div class="kpi-label">Pontuação Média Inicial</div><div class="kpi-value">{media_inicial:.2f}</div></div>', unsafe_allow_html=True)
-    with col3: 
-        st.markdown(f'<div class="card"><div class="kpi-label">Pontuação Média Final</div><div class="kpi-value">{media_final:.2f}</div></div>', unsafe_allow_html=True)
+        # 'Total de produtores' sincronizado com o KPI de atendimentos finalizados do topo
+        for coluna_kpi, cartao in zip(st.columns(3), graficos.cartoes_visao_geral(kpis)):
+            with coluna_kpi: st.markdown(cartao, unsafe_allow_html=True)
     
-    st.markdown("---") 
+        st.markdown("---") 
     
-    if not niveis_filtrado_df.empty:
-        niveis_filtrado_df["Nível"] = pd.Categorical(
-            niveis_filtrado_df["Nível"], categories=NIVEIS_ORDER, ordered=True
-        )
-        niveis_chart_df = niveis_filtrado_df.melt(
-            id_vars=["Grupo", "Nível"],
-            value_vars=["Qtd Inicial", "Qtd Final"],
-            var_name="Tipo",
-            value_name="Quantidade"
-        )
-        fig_niveis = px.bar(
-            niveis_chart_df,
-            x="Nível",
-            y="Quantidade",
-            color="Tipo",
-            text="Quantidade",
-            barmode="group",
-            title=f"Distribuição de Níveis - {texto_selecao}",
-            labels={"Quantidade": "Nr. Participantes"},
-            color_discrete_map=mapa_cores_evolucao,
-            category_orders={"Nível": NIVEIS_ORDER}
-        )
-        fig_niveis.update_traces(
-            texttemplate='%{text:.0f}',
-            textposition='auto'
-        )
-        fig_niveis.update_yaxes(showgrid=False)
-        fig_niveis.update_xaxes(tickfont=dict(weight='bold'))
-        fig_niveis.update_layout(
-            height=500,
-            title_font_size=20
-        )
-        fig_niveis = style_fig(fig_niveis)
-        st.plotly_chart(fig_niveis)
-    else:
-        st.info("Nenhum dado de nível para a seleção atual.")
+        if not niveis_filtrado_df.empty:
+            fig_niveis = figura("niveis", VERSAO_DADOS, grupos_chave, None,
+                                lambda: graficos.fig_niveis(niveis_filtrado_df, texto_selecao))
+            desenhar("niveis", fig_niveis)
+        else:
+            st.info("Nenhum dado de nível para a seleção atual.")
 
 
 # ==============================================================
 # ---------------- TAB 2 - DETALHE CANCELADAS -----------------
 # ==============================================================
 
-with tab_canceladas:
-    st.header("Detalhe das Consultorias Canceladas")
-    st.write("Distribuição de quantas etapas foram concluídas antes do cancelamento.")
+with tab_canceladas, medidor.etapa("aba Detalhe Canceladas"):
+    if aba_aberta["Detalhe Canceladas"]:
+        st.header("Detalhe das Consultorias Canceladas")
+        st.write("Distribuição de quantas etapas foram concluídas antes do cancelamento.")
 
-    if not canceladas_df.empty and "COOPERATIVA" in canceladas_df.columns:
-        # Usa o dataframe filtrado (canceladas_filtrado_df)
-        # IMPORTANTE: REMOVER A LINHA DE TOTAL DO DATAFRAME DE PLOTAGEM
-        plot_df = canceladas_filtrado_df.dropna(subset=['COOPERATIVA'])
-        plot_df = plot_df[plot_df['COOPERATIVA'].str.upper() != 'TOTAL'].copy()
-        
-        colunas_encontros = ["1 Encontro realizado", "2 Encontros realizados", "3 Encontros realizados", "4 Encontros realizados"]
-        colunas_encontros_existentes = [col for col in colunas_encontros if col in plot_df.columns]
+        if not canceladas_df.empty:
+            # Usa o dataframe filtrado (canceladas_filtrado_df), que já vem sem a linha de total do Excel
+            plot_df = canceladas_filtrado_df
 
-        if colunas_encontros_existentes:
-            melted_df = plot_df.melt(id_vars="COOPERATIVA", value_vars=colunas_encontros_existentes, var_name="Etapa", value_name="Quantidade")
-            melted_df = melted_df[melted_df["Quantidade"] > 0]
-            
-            if not melted_df.empty:
-                if "TOTAL" in plot_df.columns:
-                    plot_df = plot_df.sort_values(by="TOTAL", ascending=True)
-                
-                fig_cancel = px.bar(
-                    melted_df, 
-                    x="Quantidade", 
-                    y="COOPERATIVA", 
-                    color="Etapa", 
-                    orientation='h', 
-                    barmode='stack', 
-                    title="Consultorias Canceladas por Etapa Concluída",
-                    category_orders={"COOPERATIVA": plot_df["COOPERATIVA"].tolist()}, 
-                    text="Quantidade"
-                )
-                
-                # Texto deitado (0 graus) e centralizado
-                fig_cancel.update_traces(
-                    textposition='inside', 
-                    textfont=dict(weight='bold'),
-                    texttemplate='%{text:.0f}',
-                    textangle=0,
-                    insidetextanchor='middle' 
-                )
-                
-                fig_cancel.update_xaxes(showgrid=False)
-                fig_cancel = style_fig(fig_cancel)
-                st.plotly_chart(fig_cancel, use_container_width=True)
+            fig_cancel = figura("canceladas_etapas", VERSAO_DADOS, grupos_chave, None,
+                                lambda: graficos.fig_canceladas_etapas(plot_df, COLUNAS_ENCONTROS))
+            if fig_cancel is not None:
+                plot_df = plot_df.sort_values(by="TOTAL", ascending=True, kind="stable")
+                desenhar("canceladas_etapas", fig_cancel, use_container_width=True)
             else:
                 st.info("Não há dados de cancelamento por etapas para exibir.")
-        else:
-            st.warning("Colunas de encontros ('1 Encontro realizado', etc.) não encontradas na aba 'canceladas_detalhe'.")
 
-        st.subheader("Ranking de Cancelamentos")
-        
-        if "TOTAL" in canceladas_filtrado_df.columns:
-            if "TOTAL" in plot_df.columns:
-                plot_df["TOTAL"] = pd.to_numeric(plot_df["TOTAL"], errors='coerce').fillna(0)
-                ranked_canceladas_df = plot_df.sort_values(by="TOTAL", ascending=True)
-                
-                fig_ranking = px.bar(
-                    ranked_canceladas_df[ranked_canceladas_df["TOTAL"] > 0],
-                    x="TOTAL",
-                    y="COOPERATIVA",
-                    orientation='h',
-                    text="TOTAL",
-                    title="Total de Cancelamentos por Cooperativa",
-                    color_discrete_sequence=[cor_grafico_principal]
-                )
-                fig_ranking.update_traces(
-                    textposition='outside',
-                    textfont=dict(weight='bold')
-                )
-                fig_ranking.update_xaxes(showgrid=False)
-                fig_ranking.update_yaxes(title=None) 
-                fig_ranking = style_fig(fig_ranking)
-                st.plotly_chart(fig_ranking, use_container_width=True)
+            st.subheader("Ranking de Cancelamentos")
+            fig_ranking = figura("canceladas_ranking", VERSAO_DADOS, grupos_chave, None,
+                                 lambda: graficos.fig_ranking_canceladas(plot_df))
+            desenhar("canceladas_ranking", fig_ranking, use_container_width=True)
 
-        else:
-            st.warning("Coluna 'TOTAL' não encontrada.")
+            with st.expander("Ver Dados Brutos"):
+                tabela_paginada(plot_df, "canceladas", VERSAO_DADOS, grupos_chave)
 
-        with st.expander("Ver Dados Brutos"):
-            st.dataframe(plot_df) # Mostra o DF limpo sem o total geral
-
-    else:
-        st.warning("Não foi possível carregar os dados de cancelamento. Verifique a aba 'canceladas_detalhe' no Excel.")
+        else:
+            st.warning("Não foi possível carregar os dados de cancelamento. Verifique a aba 'canceladas_detalhe' no Excel.")
 
 # ==============================================================
 # ---------------- TAB 3 - COMPARATIVO -------------------------
 # ==============================================================
 
-with tab_comparativo:
-    # --- GRÁFICO 1: CONHECIMENTO (PONTUAÇÃO) ---
-    st.header("Comparativo de Pontuação Média (Conhecimento)")
-    st.subheader(f"Exibindo resultados para: {texto_selecao}")
+with tab_comparativo, medidor.etapa("aba Análise Comparativa por Grupo"):
+    if aba_aberta["Análise Comparativa por Grupo"]:
+        # --- GRÁFICO 1: CONHECIMENTO (PONTUAÇÃO) ---
+        st.header("Comparativo de Pontuação Média (Conhecimento)")
+        st.subheader(f"Exibindo resultados para: {texto_selecao}")
 
-    participant_counts = comparativo_filtrado_df["Grupo"].value_counts()
-    
-    pontuacao_por_grupo_df = comparativo_filtrado_df.groupby("Grupo")[["Pontuação Inicial", "Pontuação Final"]].mean().reset_index()
-    pontuacao_por_grupo_df["Evolução"] = pontuacao_por_grupo_df["Pontuação Final"] - pontuacao_por_grupo_df["Pontuação Inicial"]
-    
-    pontuacao_por_grupo_df["Participantes"] = pontuacao_por_grupo_df["Grupo"].apply(lambda g: participant_counts.get(g,0))
+        # Médias por grupo, participantes, adesão e médias gerais: cache por (versão, seleção)
+        pontuacao_por_grupo_df, adesao_grupos_df, medias_gerais = agregados_comparativo(
+            VERSAO_DADOS, grupos_chave, indice, financeiro_df
+        )
     
-    escolha = st.radio(
-        "Selecione:", 
-        ["Pontuação Final", "Pontuação Inicial", "Evolução", "Evolução Detalhada (Inicial vs. Final)", "Ambas"], 
-        horizontal=True, 
-        key='pontuacao_radio'
-    )
+        escolha = st.radio(
+            "Selecione:", 
+            ["Pontuação Final", "Pontuação Inicial", "Evolução", "Evolução Detalhada (Inicial vs. Final)", "Ambas"], 
+            horizontal=True, 
+            key='pontuacao_radio'
+        )
 
-    if not pontuacao_por_grupo_df.empty:
-        if escolha == "Ambas":
-            pontuacao_por_grupo_df.sort_values(by="Pontuação Final", ascending=True, inplace=True)
-            
-            melt = pontuacao_por_grupo_df.melt(
-                id_vars=["Grupo", "Participantes"], 
-                value_vars=["Pontuação Inicial", "Pontuação Final"], 
-                var_name="Tipo", 
-                value_name="Valor"
-            )
-            
-            fig = px.bar(
-                melt, 
-                x="Valor", 
-                y="Grupo", 
-                color="Tipo", 
-                orientation='h', 
-                barmode="group", 
-                color_discrete_map=mapa_cores_evolucao, 
-                title="Conhecimento: Inicial vs. Final", 
-                labels={'Valor': "Média da Pontuação", "Grupo": "Cooperativa"}, 
-                text_auto='.2f',
-                hover_data=["Participantes"]
-            )
-            fig.update_xaxes(showgrid=False)
-        
-        elif escolha == "Evolução Detalhada (Inicial vs. Final)":
-            chart_data = pontuacao_por_grupo_df.sort_values(by="Pontuação Final", ascending=True)
-            
-            fig = go.Figure()
-
-            fig.add_trace(go.Scatter(
-                x=chart_data["Pontuação Inicial"],
-                y=chart_data["Grupo"],
-                mode='markers+text', 
-                text=chart_data["Pontuação Inicial"].apply(lambda x: f"{x:.2f}"), 
-                textposition='middle left', 
-                textfont=dict(color='black', weight='bold'), 
-                name='Nota Inicial',
-                marker=dict(color='#6AA4D9', size=10),
-                customdata=chart_data["Participantes"],
-                hovertemplate='<b>%{y}</b><br>Inicial: %{x:.2f}<br>Participantes: %{customdata}<extra></extra>'
-            ))
-
-            fig.add_trace(go.Scatter(
-                x=chart_data["Pontuação Final"],
-                y=chart_data["Grupo"],
-                mode='markers+text', 
-                text=chart_data["Pontuação Final"].apply(lambda x: f"{x:.2f}"), 
-                textposition='middle right', 
-                textfont=dict(color='black', weight='bold'), 
-                name='Nota Final',
-                marker=dict(color='#084074', size=14),
-                customdata=chart_data["Participantes"],
-                hovertemplate='<b>%{y}</b><br>Final: %{x:.2f}<br>Participantes: %{customdata}<extra></extra>'
-            ))
-
-            for i, row in chart_data.iterrows():
-                fig.add_shape(
-                    type="line",
-                    x0=row["Pontuação Inicial"], y0=row["Grupo"],
-                    x1=row["Pontuação Final"], y1=row["Grupo"],
-                    line=dict(color="gray", width=1)
-                )
-
-            fig.update_layout(
-                title="Pontuação Inicial vs. Final (Detalhado)",
-                xaxis_title="Média de Pontuação",
-                yaxis_title="Cooperativa",
-                height=600,
-                margin=dict(l=0, r=0, t=40, b=0),
-                legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
-                font=dict(color="black")
-            )
-            
-            fig.update_xaxes(showgrid=False, tickfont=dict(color='black', weight='bold'))
-            fig.update_yaxes(showgrid=False, tickfont=dict(color='black', weight='bold'))
-            
-            fig = style_fig(fig)
-            st.plotly_chart(fig, use_container_width=True)
-        
+        if not pontuacao_por_grupo_df.empty:
+            fig = figura("pontuacao", VERSAO_DADOS, grupos_chave, escolha,
+                         lambda: graficos.fig_pontuacao(pontuacao_por_grupo_df, escolha, medias_gerais.get(escolha)))
+            desenhar("pontuacao", fig, use_container_width=True)
         else:
-            dados_plot = pontuacao_por_grupo_df.sort_values(by=escolha, ascending=True)
-            fig = px.bar(
-                dados_plot, 
-                x=escolha, 
-                y="Grupo", 
-                orientation='h', 
-                title=f"Ranking de {escolha} (Conhecimento)", 
-                labels={escolha: "Pontuação", "Grupo": "Cooperativa"}, 
-                text_auto='.2f', 
-                color_discrete_sequence=[cor_grafico_principal],
-                hover_data=["Participantes"]
-            )
-            
-            if escolha == "Evolução":
-                media_geral = (comparativo_filtrado_df["Pontuação Final"] - comparativo_filtrado_df["Pontuação Inicial"]).mean()
-            else:
-                media_geral = comparativo_filtrado_df[escolha].mean()
-
-            fig.add_vline(x=media_geral, line_width=2, line_dash="dash", line_color="#F2E77F", annotation_text=f"Média: {media_geral:.1f}")
-            fig.update_xaxes(showgrid=False) 
-
-        if escolha != "Evolução Detalhada (Inicial vs. Final)":
-            fig = style_fig(fig)
-            st.plotly_chart(fig, use_container_width=True)
-    else:
-        st.info("Nenhum dado de pontuação para a seleção atual.")
+            st.info("Nenhum dado de pontuação para a seleção atual.")
     
-    st.markdown("---")
+        st.markdown("---")
 
-    # --- GRÁFICO 2: ADESÃO À TRILHA ---
-    st.header("Análise do bloco de Gestão Financeira da Trilha de adesão")
-    st.markdown("Este bloco analisa o **engajamento e a execução** das funcionalidades do bloco de gestão financeira.")
+        # --- GRÁFICO 2: ADESÃO À TRILHA ---
+        st.header("Análise do bloco de Gestão Financeira da Trilha de adesão")
+        st.markdown("Este bloco analisa o **engajamento e a execução** das funcionalidades do bloco de gestão financeira.")
     
-    adesao_grupos_df = financeiro_filtrado_df[financeiro_filtrado_df["Grupo"] != "TOTAL"].copy()
-    adesao_grupos_df["Participantes"] = adesao_grupos_df["Grupo"].apply(lambda g: participant_counts.get(g,0))
-    
-    if not adesao_grupos_df.empty:
-        if 'Evolução Absoluta' in adesao_grupos_df.columns and "Soma Final" in adesao_grupos_df.columns:
-            adesao_grupos_df["Soma Final"].fillna(adesao_grupos_df['Evolução Absoluta'], inplace=True)
-        if 'Soma Inicial' in adesao_grupos_df.columns and 'Soma Inicial (todos)' in adesao_grupos_df.columns:
-            adesao_grupos_df['Soma Inicial'].fillna(adesao_grupos_df['Soma Inicial (todos)'], inplace=True)
-        
-        adesao_grupos_df["Ganho de Adesão"] = adesao_grupos_df["Soma Final"] - adesao_grupos_df["Soma Inicial"]
-
-        escolha_adesao = st.radio(
-            "Selecione:", 
-            ('Pontuação Final (Acumulado)', 'Evolução (Ganho)', 'Evolução Detalhada (Inicial vs. Final)'), 
-            horizontal=True, 
-            key='adesao_radio'
-        )
-        
-        if escolha_adesao == 'Pontuação Final (Acumulado)':
-            dados_plot = adesao_grupos_df.sort_values(by="Soma Final", ascending=True)
-            fig_adesao = px.bar(
-                dados_plot, 
-                x="Soma Final", 
-                y="Grupo", 
-                orientation='h',
-                title="Panorama de Adesão Final (Pontuação Acumulada)",
-                labels={"Soma Final": "Pontos de Adesão", "Grupo": "Cooperativa"},
-                text="Soma Final",
-                color_discrete_sequence=[cor_grafico_principal],
-                hover_data=["Participantes"]
-            )
-            fig_adesao.update_traces(
-                textposition='inside', 
-                textfont=dict(weight='bold'),
-                texttemplate='%{text:.0f}',
-                textangle=0,
-                insidetextanchor='middle'
+        if not adesao_grupos_df.empty:
+            escolha_adesao = st.radio(
+                "Selecione:", 
+                ('Pontuação Final (Acumulado)', 'Evolução (Ganho)', 'Evolução Detalhada (Inicial vs. Final)'), 
+                horizontal=True, 
+                key='adesao_radio'
             )
-            fig_adesao.update_xaxes(showgrid=False)
-            fig_adesao = style_fig(fig_adesao)
-            st.plotly_chart(fig_adesao, use_container_width=True)
-
-        elif escolha_adesao == 'Evolução (Ganho)':
-            dados_plot = adesao_grupos_df.sort_values(by="Ganho de Adesão", ascending=True)
-            fig_adesao = px.bar(
-                dados_plot, 
-                x="Ganho de Adesão", 
-                y="Grupo", 
-                orientation='h',
-                title="Evolução (Pontos Ganhos durante a Consultoria)",
-                labels={"Ganho de Adesão": "Novos Pontos Conquistados", "Grupo": "Cooperativa"},
-                text="Ganho de Adesão",
-                color_discrete_sequence=[cor_grafico_principal], 
-                hover_data=["Participantes"]
-            )
-            
-            fig_adesao.update_traces(
-                textposition='inside', 
-                textfont=dict(weight='bold'),
-                texttemplate='%{text:.0f}',
-                textangle=0,
-                insidetextanchor='middle'
-            )
-            
-            media_esforco = adesao_grupos_df["Ganho de Adesão"].mean()
-            fig_adesao.add_vline(x=media_esforco, line_width=2, line_dash="dash", line_color="#F2E77F", annotation_text=f"Média: {media_esforco:.0f}")
-            
-            fig_adesao.update_xaxes(showgrid=False)
-            fig_adesao = style_fig(fig_adesao)
-            st.plotly_chart(fig_adesao, use_container_width=True)
-
-        elif escolha_adesao == 'Evolução Detalhada (Inicial vs. Final)':
-            chart_data = adesao_grupos_df.sort_values(by="Soma Final", ascending=True)
-            
-            fig_adesao = go.Figure()
-
-            fig_adesao.add_trace(go.Scatter(
-                x=chart_data["Soma Inicial"],
-                y=chart_data["Grupo"],
-                mode='markers+text', 
-                text=chart_data["Soma Inicial"].apply(lambda x: f"{x:.0f}"), 
-                textposition='middle left', 
-                textfont=dict(color='black', weight='bold'), 
-                name='Adesão Inicial',
-                marker=dict(color='#6AA4D9', size=10),
-                customdata=chart_data["Participantes"],
-                hovertemplate='<b>%{y}</b><br>Inicial: %{x:.0f}<br>Participantes: %{customdata}<extra></extra>'
-            ))
-
-            fig_adesao.add_trace(go.Scatter(
-                x=chart_data["Soma Final"],
-                y=chart_data["Grupo"],
-                mode='markers+text', 
-                text=chart_data["Soma Final"].apply(lambda x: f"{x:.0f}"), 
-                textposition='middle right', 
-                textfont=dict(color='black', weight='bold'), 
-                name='Adesão Final',
-                marker=dict(color='#084074', size=14),
-                customdata=chart_data["Participantes"],
-                hovertemplate='<b>%{y}</b><br>Final: %{x:.0f}<br>Participantes: %{customdata}<extra></extra>'
-            ))
-
-            for i, row in chart_data.iterrows():
-                fig_adesao.add_shape(
-                    type="line",
-                    x0=row["Soma Inicial"], y0=row["Grupo"],
-                    x1=row["Soma Final"], y1=row["Grupo"],
-                    line=dict(color="gray", width=1)
-                )
-
-            fig_adesao.update_layout(
-                title="Pontuação Inicial vs. Final",
-                xaxis_title="Pontos de Adesão",
-                yaxis_title="Cooperativa",
-                height=600,
-                margin=dict(l=0, r=0, t=40, b=0),
-                legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
-                font=dict(color="black")
-            )
-            
-            # Remove a grade e garante fonte preta, SEM borda manual extra
-            fig_adesao.update_xaxes(showgrid=False, tickfont=dict(color='black', weight='bold'))
-            fig_adesao.update_yaxes(showgrid=False, tickfont=dict(color='black', weight='bold'))
-            
-            # A borda agora vem apenas da função style_fig
-            fig_adesao = style_fig(fig_adesao)
-            st.plotly_chart(fig_adesao, use_container_width=True)
+        
+            fig_adesao = figura("adesao", VERSAO_DADOS, grupos_chave, escolha_adesao,
+                                lambda: graficos.fig_adesao(adesao_grupos_df, escolha_adesao))
+            desenhar("adesao", fig_adesao, use_container_width=True)
 
-    else:
-        st.info("Nenhum dado de adesão (trilha) disponível para a seleção atual.")
+        else:
+            st.info("Nenhum dado de adesão (trilha) disponível para a seleção atual.")
 
 # ==============================================================
 # ---------------- TAB 4 - PERFIL ------------------------------
 # ==============================================================
 
-with tab_perfil:
-    st.header("Análise de Perfil dos Produtores")
-    st.write(f"Analisando o perfil para o grupo: **{texto_selecao}**") 
-    perguntas_analise = ['TEM SUCESSÃO FAMILIAR? (JOVENS INSERIDOS NO NEGÓCIO)', 'TEM MULHER NA GESTÃO DA PROPRIEDADE?', 'A PROPRIEDADE TRABALHA COM', 'Potencial para um nível 2 de trabalho?']
-    pergunta_selecionada = st.selectbox("Escolha uma característica do perfil para analisar:", perguntas_analise)
-    perguntas_especiais = ['Potencial para um nível 2 de trabalho?', 'TEM MULHER NA GESTÃO DA PROPRIEDADE?', 'TEM SUCESSÃO FAMILIAR? (JOVENS INSERIDOS NO NEGÓCIO)']
-    if pergunta_selecionada in perguntas_especiais:
-        st.subheader(f"Análise Específica: {pergunta_selecionada}")
-        analise_especial_df = comparativo_filtrado_df.dropna(subset=[pergunta_selecionada, 'Nível Final'])
-        if analise_especial_df[pergunta_selecionada].dtype == 'object':
-            analise_especial_df = analise_especial_df[analise_especial_df[pergunta_selecionada].astype(str).str.strip() != '']
-            analise_especial_df = analise_especial_df[analise_especial_df[pergunta_selecionada] != 'nan']
-        if not analise_especial_df.empty:
-            col1, col2 = st.columns([1, 1.5])
-            with col1:
-                contagem_respostas = analise_especial_df[pergunta_selecionada].value_counts()
-                fig_pie = px.pie(values=contagem_respostas.values, names=contagem_respostas.index, title="Distribuição das Respostas", hole=.3, color_discrete_sequence=cores_principais)
-                fig_pie.update_traces(textinfo='percent+label', textfont_size=14)
-                fig_pie = style_fig(fig_pie)
-                st.plotly_chart(fig_pie, use_container_width=True)
-            with col2:
-                analise_especial_df["Nível Final"] = pd.Categorical(analise_especial_df["Nível Final"], categories=NIVEIS_ORDER, ordered=True)
-                niveis_por_resposta = analise_especial_df.groupby([pergunta_selecionada, 'Nível Final']).size().reset_index(name='Contagem')
-                niveis_por_resposta.sort_values(by="Nível Final", inplace=True)
-                fig_niveis_resp = px.bar(niveis_por_resposta, x='Nível Final', y='Contagem', color=pergunta_selecionada, barmode='group', title="Distribuição do Nível Final por Resposta", labels={'Contagem': 'Nr. de Produtores', 'Nível Final': 'Nível Final'}, category_orders={"Nível Final": NIVEIS_ORDER}, color_discrete_map=mapa_cores_sim_nao)
-                fig_niveis_resp.update_traces(texttemplate='%{y}', textposition='outside')
-                fig_niveis_resp.update_yaxes(showgrid=False) 
-                fig_niveis_resp = style_fig(fig_niveis_resp)
-                st.plotly_chart(fig_niveis_resp, use_container_width=True)
-        else:
-            st.warning(f"Não há dados suficientes para a análise de '{pergunta_selecionada}' neste grupo.")
-    else:
-        st.subheader(f"Distribuição de Respostas para: {pergunta_selecionada}")
-        analise_df = comparativo_filtrado_df.dropna(subset=[pergunta_selecionada])
-        if analise_df[pergunta_selecionada].dtype == 'object':
-            analise_df = analise_df[analise_df[pergunta_selecionada].astype(str).str.strip() != '']
-            analise_df = analise_df[analise_df[pergunta_selecionada] != 'nan']
-        if not analise_df.empty:
-            counts = analise_df[pergunta_selecionada].value_counts()
-            percentages = analise_df[pergunta_selecionada].value_counts(normalize=True) * 100
-            summary_df = pd.DataFrame({'Resposta': counts.index, 'Contagem': counts.values, 'Porcentagem': percentages.values})
-            summary_df = summary_df.sort_values(by='Contagem', ascending=True)
-            fig_perfil = px.bar(summary_df, x='Contagem', y='Resposta', orientation='h', title=f'Distribuição de Respostas para: "{pergunta_selecionada}"', text=summary_df['Porcentagem'].apply(lambda p: f'{p:.1f}%'))
-            fig_perfil.update_traces(textposition='outside', marker_color=cores_principais[0])
-            fig_perfil.update_layout(yaxis_title="Respostas", xaxis_title="Número de Respostas")
-            fig_perfil.update_xaxes(showgrid=False)
-            fig_perfil = style_fig(fig_perfil)
-            st.plotly_chart(fig_perfil, use_container_width=True)
+with tab_perfil, medidor.etapa("aba Análise por Perfil"):
+    if aba_aberta["Análise por Perfil"]:
+        st.header("Análise de Perfil dos Produtores")
+        st.write(f"Analisando o perfil para o grupo: **{texto_selecao}**") 
+        pergunta_selecionada = st.selectbox("Escolha uma característica do perfil para analisar:", PERGUNTAS_PERFIL, key="pergunta_perfil")
+        # contagens da seleção = soma das linhas do cubo dos grupos escolhidos (sem passar pelos participantes)
+        with medidor.etapa("cubo do perfil"):
+            cubo = cubos_perfil(VERSAO_DADOS, tuple(PERGUNTAS_PERFIL), comparativo_df)[pergunta_selecionada]
+            soma_perfil = somar_cubo(cubo, grupos_chave)
+        if pergunta_selecionada in PERGUNTAS_POR_NIVEL:
+            st.subheader(f"Análise Específica: {pergunta_selecionada}")
+            contagem_especial = contagem_respostas(soma_perfil, com_nivel=True)
+            if not contagem_especial.empty:
+                col1, col2 = st.columns([1, 1.5])
+                with col1:
+                    fig_pie = figura("perfil_pizza", VERSAO_DADOS, grupos_chave, pergunta_selecionada,
+                                     lambda: graficos.fig_perfil_pizza(contagem_especial))
+                    desenhar("perfil_pizza", fig_pie, use_container_width=True)
+                with col2:
+                    fig_niveis_resp = figura("perfil_niveis", VERSAO_DADOS, grupos_chave, pergunta_selecionada,
+                                             lambda: graficos.fig_perfil_niveis(niveis_por_resposta(soma_perfil, pergunta_selecionada, NIVEIS_ORDER), pergunta_selecionada))
+                    desenhar("perfil_niveis", fig_niveis_resp, use_container_width=True)
+            else:
+                st.warning(f"Não há dados suficientes para a análise de '{pergunta_selecionada}' neste grupo.")
         else:
-            st.warning(f"Não há dados para a pergunta '{pergunta_selecionada}' neste grupo.")
+            st.subheader(f"Distribuição de Respostas para: {pergunta_selecionada}")
+            counts = contagem_respostas(soma_perfil)
+            if not counts.empty:
+                fig_perfil = figura("perfil_respostas", VERSAO_DADOS, grupos_chave, pergunta_selecionada,
+                                    lambda: graficos.fig_perfil_respostas(resumo_respostas(counts), pergunta_selecionada))
+                desenhar("perfil_respostas", fig_perfil, use_container_width=True)
+            else:
+                st.warning(f"Não há dados para a pergunta '{pergunta_selecionada}' neste grupo.")
             
 # ==============================================================
 # ---------------- TAB 5 - DETALHES ----------------------------
 # ==============================================================
 
-with tab_detalhes:
-    st.header("Detalhes por Participante")
-    st.subheader(f"Exibindo participantes de: {texto_selecao}") 
-    st.dataframe(comparativo_filtrado_df)
\ No newline at end of file
+with tab_detalhes, medidor.etapa("aba Dados Detalhados"):
+    if aba_aberta["Dados Detalhados"]:
+        st.header("Detalhes por Participante")
+        st.subheader(f"Exibindo participantes de: {texto_selecao}") 
+        tabela_paginada(comparativo_filtrado_df, "participantes", VERSAO_DADOS, grupos_chave)
+
+# ================== TEMPOS DO RERUN ==================
+resumo_tempos = medidor.finalizar()
+arquivo_tempos = exportar_jsonl(resumo_tempos)
+if MOSTRAR_TEMPOS:
+    with st.sidebar.expander("⏱️ Tempos deste rerun"):
+        st.write(f"**Total: {resumo_tempos['total_ms']:.0f} ms**")
+        for item in resumo_tempos["etapas"]:
+            st.write("\u2003" * item["nivel"] + f"{item['nome']}: {item['ms']:.0f} ms")
+        if resumo_tempos["perfil"]:
+            st.code(resumo_tempos["perfil"], language=None)
+        if arquivo_tempos is not None:
+            st.caption(f"Sessão gravada em {arquivo_tempos}")
\ No newline at end of file
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+# Recarga dos dados em segundo plano (stale-while-revalidate), sem depender do Streamlit:
+# o painel serve sempre a versão publicada; quando o arquivo muda, uma thread monta a versão nova
+# (tabelas + índices) fora dos reruns e só então a publica, trocando uma referência só.
+#  • PAINEL_RECARGA_S=N  -> a thread também confere o arquivo a cada N s (padrão 60); 0 = sem thread:
+#                           a troca acontece no próprio rerun que notar a mudança (como antes)
+from pathlib import Path
+import os
+import threading
+import time
+
+from dados import hash_arquivo
+
+INTERVALO_RECARGA = float(os.environ.get("PAINEL_RECARGA_S", "60"))
+ESPERA_GRAVACAO = 1.0  # acordada por mudança, espera a gravação do xlsx terminar antes de ler
+
+class Recarregador:
+    def __init__(self, caminho, carregar, intervalo: float = INTERVALO_RECARGA):
+        self.caminho = Path(caminho)
+        self.carregar = carregar    # versao -> pacote pronto (o que os reruns usam dessa versão)
+        self.intervalo = intervalo
+        self.atual = None           # (versao, pacote) publicado; só é trocado inteiro
+        self.carregando = None      # versão sendo montada agora (para o painel avisar)
+        self.erro = None            # última falha da thread (a versão publicada continua valendo)
+        self._assinatura = None     # (mtime, tamanho) do arquivo na última conferência
+        self._hash = (None, None)   # (assinatura, hash): o hash só é refeito quando o arquivo muda
+        self._trava = threading.Lock()
+        self._acordar = threading.Event()
+        self._parar = threading.Event()
+        self._thread = None
+
+    def assinatura(self) -> tuple[int, int]:
+        info = os.stat(self.caminho)
+        return info.st_mtime_ns, info.st_size
+
+    def versao(self) -> str:
+        # hash do conteúdo: arquivo "tocado" mas igual mantém a versão
+        assinatura = self.assinatura()
+        if self._hash[0] != assinatura:
+            self._hash = (assinatura, hash_arquivo(self.caminho))
+        return self._hash[1]
+
+    def obter(self) -> tuple[str, object]:
+        # (versão, pacote) publicado. Só a 1ª chamada do processo espera a carga; depois disso um rerun
+        # no máximo nota (stat) que o arquivo mudou e acorda a thread, servindo a versão anterior
+        if self.atual is None:
+            with self._trava:
+                if self.atual is None:
+                    self._assinatura = self.assinatura()
+                    versao = self.versao()
+                    self.atual = (versao, self.carregar(versao))
+                self._iniciar()  # sob a trava: duas sessões chegando juntas não sobem duas threads
+            return self.atual
+        try:
+            if self.assinatura() != self._assinatura:
+                if self._thread is None:
+                    self.verificar()
+                else:
+                    self._acordar.set()
+        except OSError:
+            pass  # arquivo sendo trocado (apagado e copiado de novo): segue a versão publicada até ele voltar
+        return self.atual
+
+    def verificar(self) -> bool:
+        # uma conferência completa; True se publicou uma versão nova
+        with self._trava:
+            self._assinatura = self.assinatura()
+            versao = self.versao()
+            if versao == self.atual[0]:
+                return False
+            self.carregando = versao
+            try:
+                pacote = self.carregar(versao)
+            finally:
+                self.carregando = None
+            if self.versao() != versao:
+                return False  # o arquivo mudou de novo durante a carga: a próxima conferência pega a final
+            self.atual = (versao, pacote)
+            return True
+
+    def _iniciar(self):
+        # só com a trava na mão (ver obter)
+        if self.intervalo <= 0 or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._laco, name="recarga-dados", daemon=True)
+        self._thread.start()
+
+    def parar(self):
+        self._parar.set()
+        self._acordar.set()
+
+    def _laco(self):
+        while not self._parar.is_set():
+            if self._acordar.wait(self.intervalo):
+                time.sleep(ESPERA_GRAVACAO)
+                self._acordar.clear()
+            if self._parar.is_set():
+                return
+            try:
+                if self.verificar():
+                    print(f"🔄 Dados atualizados para a versão {self.atual[0][:12]}")
+                self.erro = None
+            except Exception as e:
+                # arquivo no meio de uma gravação, aba faltando...: segue a versão publicada e tenta de novo
+                self.erro = e
+                print(f"⚠️ Recarga dos dados falhou ({e}); o painel segue com a versão anterior")
+
+# --------- UM RECARREGADOR POR ARQUIVO NO PROCESSO ---------
+# fora dos caches do Streamlit: limpar os caches do painel não derruba os dados carregados nem a thread
+_RECARREGADORES = {}
+_TRAVA_REGISTRO = threading.Lock()
+
+def recarregador(caminho, carregar) -> Recarregador:
+    # o mesmo para todas as sessões que abrem esse arquivo (caminho absoluto)
+    caminho = Path(caminho).resolve()
+    with _TRAVA_REGISTRO:
+        if caminho not in _RECARREGADORES:
+            _RECARREGADORES[caminho] = Recarregador(caminho, carregar)
+        return _RECARREGADORES[caminho]
+
+def descartar():
+    # esquece as versões carregadas e para as threads: a próxima carga começa do zero (benchmarks)
+    with _TRAVA_REGISTRO:
+        for item in _RECARREGADORES.values():
+            item.parar()
+        _RECARREGADORES.clear()
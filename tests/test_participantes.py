@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+# Junção comparativo ⟕ questionário do dados.montar_participantes (rodar com: python -m pytest tests)
+from pathlib import Path
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from dados import montar_participantes  # noqa: E402
+
+def test_chave_nao_colide_entre_cooperativas():
+    # 6 clientes no dicionário e 3 linhas por aba: com o multiplicador errado (linhas + 1 = 4),
+    # (B, c1) = 1*4 + 1 caía na mesma chave que (A, q5) = 0*4 + 5 e levava as respostas de A
+    comparativo = pd.DataFrame({"Grupo": ["A", "B", "A"], "Cliente": ["c0", "c1", "c2"]})
+    questionario = pd.DataFrame({"COOPERATIVA": ["A", "A", "A"], "CLIENTE": ["q3", "q4", "q5"],
+                                 "Resposta": ["r3", "r4", "r5"]})
+    participantes, relatorio = montar_participantes(comparativo, questionario)
+    assert participantes["Resposta"].isna().all()
+    assert len(relatorio.query("problema == 'questionário sem participante'")) == 3
+    assert len(relatorio.query("problema == 'participante sem questionário'")) == 3
+
+def test_respostas_casam_pelo_par_grupo_cliente():
+    # o mesmo cliente em duas cooperativas recebe a resposta da sua
+    comparativo = pd.DataFrame({"Grupo": ["A", "B"], "Cliente": ["Ana", " ana "]})
+    questionario = pd.DataFrame({"COOPERATIVA": ["B", "A"], "CLIENTE": ["ANA", "Ana"], "Resposta": ["de B", "de A"]})
+    participantes, relatorio = montar_participantes(comparativo, questionario)
+    assert participantes["Resposta"].tolist() == ["de A", "de B"]
+    assert relatorio.empty